@@ -0,0 +1,99 @@
+"""
+Measures the throughput of `Router.match` shared by 1 to 32 threads.
+
+Run it with a free-threaded build of Python, e.g. `python3.13t`, to see the
+scaling of the lock-free read path; with the GIL, throughput stays flat:
+
+    python3.13t benchmarks/thread_scaling.py
+"""
+
+import argparse
+import sys
+import threading
+from time import perf_counter
+
+from yrouter import Router, route
+
+THREAD_COUNTS = (1, 2, 4, 8, 16, 32)
+
+
+def handler():
+    pass
+
+
+def get_router(cache_size: int) -> Router:
+    routes = (
+        route("", handler, name="home"),
+        route("about/", handler, name="about"),
+        route(
+            "users/",
+            subroutes=(
+                route(
+                    "<int:id>/",
+                    handler,
+                    name="user",
+                    subroutes=(route("posts/<slug:slug>/", handler, name="post"),),
+                ),
+            ),
+        ),
+        route("files/<path:path>", handler, name="file"),
+    )
+    return Router(routes, cache_size=cache_size)
+
+
+def get_paths(count: int) -> list:
+    paths = []
+    for index in range(count):
+        paths.append(f"/users/{index}/")
+        paths.append(f"/users/{index}/posts/post-{index}/")
+        paths.append(f"/files/{index}/report.pdf")
+        paths.append(f"/unknown-{index}/")
+    return paths
+
+
+def run(router: Router, paths: list, threads: int, rounds: int) -> float:
+    """Returns the number of matches per second of `threads` threads."""
+
+    barrier = threading.Barrier(threads + 1)
+
+    def work():
+        match = router.match
+        barrier.wait()
+        for _ in range(rounds):
+            for path in paths:
+                match(path)
+
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    barrier.wait()
+    start = perf_counter()
+    for worker in workers:
+        worker.join()
+    return threads * rounds * len(paths) / (perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--paths", type=int, default=256, help="paths per route")
+    parser.add_argument("--rounds", type=int, default=20, help="rounds per thread")
+    parser.add_argument("--cache-size", type=int, default=1024)
+    args = parser.parse_args()
+
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"Python {sys.version.split()[0]}, GIL {'enabled' if gil else 'disabled'}")
+
+    router, paths = get_router(args.cache_size), get_paths(args.paths)
+    # Built before timing, so that the first threads don't pay for it.
+    router.freeze()
+
+    baseline = None
+    print(f"{'threads':>7} {'matches/s':>12} {'speedup':>8}")
+    for threads in THREAD_COUNTS:
+        throughput = run(router, paths, threads, args.rounds)
+        baseline = baseline or throughput
+        print(f"{threads:>7} {throughput:>12,.0f} {throughput / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,9 @@
 from .converters import REFUSED, AbstractConverter
 from .exceptions import RouterConfigurationError, UnknownConverter
-from .match import NoMatch
-from .route import route
+from .match import MethodNotAllowed, NoMatch
+from .route import lazy_route, route
 from .router import Router
+from .shared_cache import SharedMatchCache
 
 __version__ = "1.1.0"
 
@@ -11,8 +12,11 @@ __all__ = [
     "AbstractConverter",
     "RouterConfigurationError",
     "UnknownConverter",
+    "MethodNotAllowed",
     "NoMatch",
     "route",
+    "lazy_route",
     "Router",
+    "SharedMatchCache",
     "__version__",
 ]
@@ -0,0 +1,136 @@
+from typing import Any, Awaitable, Callable, Dict, List, MutableMapping, Optional, Tuple
+
+from .match import MethodNotAllowed
+from .router import Router
+from .utils import redirect_location
+
+Scope = MutableMapping[str, Any]
+Message = Dict[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+
+NOT_FOUND_BODY = b"Not Found"
+METHOD_NOT_ALLOWED_BODY = b"Method Not Allowed"
+
+# Messages sent as is, for every request they answer.
+NOT_FOUND_START: Message = {
+    "type": "http.response.start",
+    "status": 404,
+    "headers": [
+        (b"content-type", b"text/plain; charset=utf-8"),
+        (b"content-length", str(len(NOT_FOUND_BODY)).encode()),
+    ],
+}
+NOT_FOUND: Message = {"type": "http.response.body", "body": NOT_FOUND_BODY}
+METHOD_NOT_ALLOWED: Message = {
+    "type": "http.response.body",
+    "body": METHOD_NOT_ALLOWED_BODY,
+}
+EMPTY_BODY: Message = {"type": "http.response.body", "body": b""}
+REDIRECT_HEADERS: List[Tuple[bytes, bytes]] = [(b"content-length", b"0")]
+WEBSOCKET_CLOSE: Message = {"type": "websocket.close", "code": 1000}
+
+
+class ASGIDispatcher:
+    """
+    An ASGI application dispatching HTTP and WebSocket connections to the handlers
+    of `router`, called as `await handler(scope, receive, send, **kwargs)`.
+    Paths that should be redirected get a permanent redirection, paths that
+    aren't matched a 404 response and methods that aren't handled a 405 response,
+    prepared once.
+    """
+
+    def __init__(self, router: Router) -> None:
+        self.router = router
+        self.not_allowed: Dict[MethodNotAllowed, Message] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        scope_type = scope["type"]
+        if scope_type == "http":
+            method = scope["method"]
+        elif scope_type == "lifespan":
+            await lifespan(receive, send)
+            return
+        else:
+            # WebSocket connections are opened by a GET request.
+            method = "GET"
+
+        router = self.router
+        # Lazy routers are built before their hosts are read.
+        if not router.frozen:
+            router.freeze()
+
+        raw_path = scope.get("raw_path")
+        match = router.match(
+            raw_path or scope["path"],
+            method,
+            None if router.hosts is None else host(scope),
+        )
+
+        if match:
+            if not match.should_redirect:
+                await match.handler(scope, receive, send, **match.kwargs)
+            elif scope_type == "http":
+                await send(
+                    redirect_start(
+                        match.redirect_to, scope.get("query_string"), bool(raw_path)
+                    )
+                )
+                await send(EMPTY_BODY)
+            else:
+                await send(WEBSOCKET_CLOSE)
+        elif scope_type != "http":
+            await send(WEBSOCKET_CLOSE)
+        elif type(match) is MethodNotAllowed:
+            await send(self.method_not_allowed_start(match))
+            await send(METHOD_NOT_ALLOWED)
+        else:
+            await send(NOT_FOUND_START)
+            await send(NOT_FOUND)
+
+    def method_not_allowed_start(self, match: MethodNotAllowed) -> Message:
+        start = self.not_allowed.get(match)
+        if start is None:
+            start = self.not_allowed[match] = {
+                "type": "http.response.start",
+                "status": 405,
+                "headers": [
+                    (b"allow", ", ".join(sorted(match.allowed_methods)).encode()),
+                    (b"content-type", b"text/plain; charset=utf-8"),
+                    (b"content-length", str(len(METHOD_NOT_ALLOWED_BODY)).encode()),
+                ],
+            }
+
+        return start
+
+
+def host(scope: Scope) -> Optional[str]:
+    for name, value in scope["headers"]:
+        if name == b"host":
+            return value.decode("latin-1")
+
+    return None
+
+
+def redirect_start(
+    redirect_to: str, query_string: bytes = b"", raw: bool = False
+) -> Message:
+    location = redirect_location(redirect_to, raw).encode()
+    if query_string:
+        location += b"?" + query_string
+
+    return {
+        "type": "http.response.start",
+        "status": 301,
+        "headers": [(b"location", location), *REDIRECT_HEADERS],
+    }
+
+
+async def lifespan(receive: Receive, send: Send) -> None:
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await send({"type": "lifespan.shutdown.complete"})
+            return
@@ -0,0 +1,119 @@
+import threading
+from time import monotonic
+from typing import Any, Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class LocalCache(Generic[T]):
+    """
+    A bounded cache whose entries are private to each thread.
+
+    Threads never share nor wait on each other's entries, which keeps lookups
+    lock-free under free-threaded builds of Python. When full, the least recently
+    used entry of the calling thread is evicted.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._local = threading.local()
+
+    def _entries(self) -> dict:
+        try:
+            return self._local.entries
+        except AttributeError:
+            entries = self._local.entries = {}
+            return entries
+
+    def get(self, key: Hashable) -> Optional[T]:
+        entries = self._entries()
+        value = entries.pop(key, None)
+        if value is not None:
+            # Moved to the end, so that the oldest entry is the least recently used.
+            entries[key] = value
+        return value
+
+    def set(self, key: Hashable, value: T) -> None:
+        entries = self._entries()
+        if len(entries) >= self.maxsize:
+            del entries[next(iter(entries))]
+        entries[key] = value
+
+    def clear(self) -> None:
+        """Clears the entries of the calling thread."""
+
+        self._entries().clear()
+
+
+class ConverterCache:
+    """
+    A bounded cache of the results of the `accepts` method of converters,
+    shared by threads. Entries expire after `ttl` seconds, if set.
+    When full, the oldest entry is evicted.
+    """
+
+    def __init__(self, maxsize: int, ttl: Optional[float] = None) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries: Dict[
+            Tuple[str, str], Tuple[Tuple[bool, dict], Optional[float]]
+        ] = {}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def wrap(self, converter: Any) -> Callable[[str], Tuple[bool, dict]]:
+        """
+        Returns the method of `converter` matching values, `validates` if it
+        `converts` them and `accepts` else, looking up this cache first.
+        """
+
+        accepts, description, entries = (
+            converter.validates if converter.converts else converter.accepts,
+            converter.description,
+            self.entries,
+        )
+
+        def cached_accepts(value: str) -> Tuple[bool, dict]:
+            entry = entries.get((description, value))
+            if entry is not None and (entry[1] is None or entry[1] > monotonic()):
+                self.hits += 1
+                return entry[0]
+
+            self.misses += 1
+            result = accepts(value)
+            self.set(description, value, result)
+            return result
+
+        return cached_accepts
+
+    def set(self, description: str, value: str, result: Tuple[bool, dict]) -> None:
+        expires = None if self.ttl is None else monotonic() + self.ttl
+        with self._lock:
+            entries = self.entries
+            if len(entries) >= self.maxsize:
+                del entries[next(iter(entries))]
+            entries[(description, value)] = (result, expires)
+
+    def invalidate(self, value: Optional[str] = None) -> None:
+        """
+        Drops the cached results for `value`, whatever the route, or all of them
+        if no value is given.
+        """
+
+        with self._lock:
+            if value is None:
+                self.entries.clear()
+                return
+
+            for key in [key for key in self.entries if key[1] == value]:
+                del self.entries[key]
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
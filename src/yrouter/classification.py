@@ -0,0 +1,70 @@
+from array import array
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Route indices are 32 bits integers on every supported platform.
+INDEX_TYPECODE = "i"
+BOOL_TYPECODE = "b"
+NO_ROUTE = -1
+
+
+class Classification:
+    """
+    The results of `Router.classify`, one row per path, stored by column:
+    `indices` holds the index of the matched route of each path, or -1 if the
+    path wasn't matched, `redirects` whether it should be redirected and `kwargs`
+    maps each keyword argument to its values, `None` where it wasn't captured.
+    `names` gives the handler name of each route index.
+
+    Arrays support the buffer protocol, to be wrapped without copies,
+    e.g. by `numpy.frombuffer(classification.indices, dtype=numpy.int32)`.
+    """
+
+    __slots__ = ("indices", "redirects", "kwargs", "names")
+
+    def __init__(
+        self,
+        indices: array,
+        redirects: array,
+        kwargs: Dict[str, List[Any]],
+        names: Tuple[Optional[str], ...],
+    ) -> None:
+        self.indices = indices
+        self.redirects = redirects
+        self.kwargs = kwargs
+        self.names = names
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def __repr__(self):
+        return f"<Classification: rows={len(self)}; kwargs={list(self.kwargs)}>"
+
+    @classmethod
+    def from_codes(
+        cls,
+        codes: array,
+        results: Sequence[Tuple[int, bool, Dict[str, Any]]],
+        names: Tuple[Optional[str], ...],
+    ) -> "Classification":
+        """
+        Builds the columns from `codes`, giving for each row the position
+        of its result in `results`, the results of distinct paths.
+        """
+
+        unique_indices = [index for index, _, _ in results]
+        unique_redirects = [redirect for _, redirect, _ in results]
+        identifiers: Dict[str, None] = {}
+        for _, _, kwargs in results:
+            identifiers.update(dict.fromkeys(kwargs))
+
+        kwargs_columns = {}
+        for identifier in identifiers:
+            values = [kwargs.get(identifier) for _, _, kwargs in results]
+            kwargs_columns[identifier] = [values[code] for code in codes]
+
+        return cls(
+            array(INDEX_TYPECODE, [unique_indices[code] for code in codes]),
+            array(BOOL_TYPECODE, [unique_redirects[code] for code in codes]),
+            kwargs_columns,
+            names,
+        )
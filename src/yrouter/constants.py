@@ -1,4 +1,14 @@
 PATH_DELIMITER = "/"
+PERCENT = "%"
+# The characters of paths left as is when percent-encoding them.
+PATH_SAFE = "/:@!$&'()*+,;=~"
 START_DESCRIPTION = "<"
 END_DESCRIPTION = ">"
 DESCRIPTION_DELIMITER = ":"
+CHOICE_DELIMITER = "|"
+REDIRECT = "redirect"
+NORMALIZE = "normalize"
+STRICT = "strict"
+SLASH_POLICIES = (REDIRECT, NORMALIZE, STRICT)
+HOST_DELIMITER = "."
+PORT_DELIMITER = ":"
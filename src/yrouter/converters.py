@@ -1,16 +1,36 @@
 import re
 import uuid
 from abc import ABC, abstractmethod
-from typing import Dict, Optional, Pattern, Tuple, Type
+from datetime import date
+from typing import Any, Dict, FrozenSet, List, Optional, Pattern, Tuple, Type
+
+from .cache import ConverterCache
+from .constants import CHOICE_DELIMITER, DESCRIPTION_DELIMITER, PATH_DELIMITER
+from .exceptions import RouterConfigurationError
+
+try:
+    from re import _parser as regex_parser
+except ImportError:  # Python < 3.11
+    import sre_parse as regex_parser  # type: ignore
 
 REFUSED: Tuple[bool, dict] = (False, {})
 CONVERTERS: Dict[str, Type["AbstractConverter"]] = {}
+REGEX_METACHARACTERS = frozenset(".^$*+?{}[]\\|()")
+DATE = re.compile(r"([0-9]{1,4})/([0-9]{1,2})/([0-9]{1,2})")
+UUID = re.compile(r"[0-9a-fA-F]{8}-(?:[0-9a-fA-F]{4}-){3}[0-9a-fA-F]{12}")
 
 
 class AbstractConverter(ABC):
     """Abstract converter from which all converters must inherit."""
 
     name: Optional[str]
+    # The number of path components matched at once by this converter.
+    segments: int = 1
+    # Set for converters declared with a `cache_size`.
+    cache: Optional[ConverterCache] = None
+    # Set for converters whose `accepts` converts the values it captures: routers
+    # then match with `validates`, and convert captured values with `convert`.
+    converts: bool = False
 
     def __init__(self, description: str, identifier: str = None) -> None:
         self.description = description
@@ -35,13 +55,67 @@ class AbstractConverter(ABC):
 
         raise NotImplementedError
 
-    def __init_subclass__(cls, converter_name):
-        """Registers a new converter."""
+    def validates(self, value: str) -> Tuple[bool, dict]:
+        """
+        Like `accepts`, but captures values before their conversion,
+        left to `convert` until they're used.
+        Converters setting `converts` override it.
+        """
+
+        return self.accepts(value)
+
+    def convert(self, value: str, native: bool = False) -> Any:
+        """
+        Converts a value captured by `validates`. If `native` is set, converters
+        converting values to their string representation return the object instead.
+        """
+
+        return value
+
+    def to_url(self, value: str) -> Optional[str]:
+        """
+        Returns the path component representing `value` if it's accepted
+        by this converter, `None` else.
+        Builtin converters override it to skip building the `accepts` result.
+        """
+
+        accepts, accepted = self.accepts(value)
+        return str(accepted[self.identifier]) if accepts else None
+
+    def __init_subclass__(
+        cls,
+        converter_name,
+        segments: Optional[int] = None,
+        cache_size: Optional[int] = None,
+        cache_ttl: Optional[float] = None,
+    ):
+        """
+        Registers a new converter. Converters matching several path components
+        at once declare how many with `segments`; `accepts` is then given
+        these components joined by slashes.
+        Converters whose `accepts` is expensive can declare a `cache_size`:
+        routers then cache up to this many of its results, for `cache_ttl`
+        seconds if set.
+        """
 
         super().__init_subclass__()
 
-        CONVERTERS[converter_name] = cls
+        # Converters are only registered once validated.
+        if segments is not None and segments < 1:
+            raise RouterConfigurationError(
+                f"The converter '{converter_name}' must match at least one segment."
+            )
+        if cache_size is not None and cache_size < 1:
+            raise RouterConfigurationError(
+                f"The converter '{converter_name}' must cache at least one result."
+            )
+
         cls.name = converter_name
+        if segments is not None:
+            cls.segments = segments
+        if cache_size is not None:
+            cls.cache = ConverterCache(cache_size, cache_ttl)
+        CONVERTERS[converter_name] = cls
 
 
 class ExactConverter(AbstractConverter, converter_name="__exact__"):
@@ -58,6 +132,9 @@ class ExactConverter(AbstractConverter, converter_name="__exact__"):
     def accepts(self, value: str) -> Tuple[bool, dict]:
         return (True, {}) if value == self.description else REFUSED
 
+    def to_url(self, value: str) -> Optional[str]:
+        return value if value == self.description else None
+
 
 class IntConverter(AbstractConverter, converter_name="int"):
     """
@@ -74,10 +151,29 @@ class IntConverter(AbstractConverter, converter_name="int"):
     (False, {})
     >>> converter.accepts("hello-world")
     (False, {})
+    >>> converter.accepts("²")
+    (False, {})
     """
 
     def accepts(self, value: str) -> Tuple[bool, dict]:
-        return (True, {self.identifier: int(value)}) if value.isdigit() else REFUSED
+        if not value.isdigit():
+            return REFUSED
+
+        # Some digits, like superscripts, and values too long to be converted
+        # safely are refused by `int`.
+        try:
+            return (True, {self.identifier: int(value)})
+        except ValueError:
+            return REFUSED
+
+    def to_url(self, value: str) -> Optional[str]:
+        if not value.isdigit():
+            return None
+
+        try:
+            return str(int(value))
+        except ValueError:
+            return None
 
 
 class StringConverter(AbstractConverter, converter_name="str"):
@@ -98,9 +194,12 @@ class StringConverter(AbstractConverter, converter_name="str"):
     def accepts(self, value: str) -> Tuple[bool, dict]:
         return (True, {self.identifier: value}) if value.isalpha() else REFUSED
 
+    def to_url(self, value: str) -> Optional[str]:
+        return value if value.isalpha() else None
+
 
 class RegexConverter(AbstractConverter, converter_name="re"):
-    """
+    r"""
     A converter that matches regular expressions.
     Since yrouter represent routes by delimiting them with the '/' character,
     a '/' isn't allowed in regex identifiers...
@@ -110,13 +209,24 @@ class RegexConverter(AbstractConverter, converter_name="re"):
     (True, {'match': 'whatever'})
     >>> converter.accepts("a-b")
     (False, {})
+
+    Values that don't start with the literal prefix of the regex, if any,
+    are refused without calling the regex engine.
+
+    >>> converter = RegexConverter(r"<re:page-(?P<page>\d+)$>", r"page-(?P<page>\d+)$")
+    >>> converter.prefix
+    'page-'
     """
 
     def __init__(self, description: str, identifier: str) -> None:
         super().__init__(description, identifier)
         self.regex: Pattern = re.compile(self.identifier)
+        self.prefix = literal_prefix(self.identifier)
 
     def accepts(self, value: str) -> Tuple[bool, dict]:
+        if not value.startswith(self.prefix):
+            return REFUSED
+
         match = self.regex.match(value)
         return (True, match.groupdict()) if match else REFUSED
 
@@ -130,14 +240,37 @@ class UUIDConverter(AbstractConverter, converter_name="uuid"):
     (True, {'uuid': '20bfa7b2-50a5-11ec-83dc-479fd603abba'})
     >>> converter.accepts("1-2-3-4")
     (False, {})
+    >>> converter.validates("20BFA7B2-50A5-11EC-83DC-479FD603ABBA")
+    (True, {'uuid': '20bfa7b2-50a5-11ec-83dc-479fd603abba'})
+    >>> converter.convert("20bfa7b2-50a5-11ec-83dc-479fd603abba", native=True)
+    UUID('20bfa7b2-50a5-11ec-83dc-479fd603abba')
     """
 
+    converts = True
+
     def accepts(self, value: str) -> Tuple[bool, dict]:
         try:
             return (True, {self.identifier: str(uuid.UUID(value))})
         except ValueError:
             return REFUSED
 
+    def validates(self, value: str) -> Tuple[bool, dict]:
+        # Captures the same string as `accepts`, only parsing the less common forms
+        # accepted by `uuid.UUID`: the `uuid.UUID` itself is built by `convert`.
+        if UUID.fullmatch(value) is not None:
+            return (True, {self.identifier: value.lower()})
+
+        return self.accepts(value)
+
+    def convert(self, value: str, native: bool = False) -> Any:
+        return uuid.UUID(value) if native else value
+
+    def to_url(self, value: str) -> Optional[str]:
+        try:
+            return str(uuid.UUID(value))
+        except ValueError:
+            return None
+
 
 class PathConverter(AbstractConverter, converter_name="path"):
     """
@@ -153,6 +286,9 @@ class PathConverter(AbstractConverter, converter_name="path"):
     def accepts(self, value: str) -> Tuple[bool, dict]:
         return (True, {self.identifier: value})
 
+    def to_url(self, value: str) -> Optional[str]:
+        return value
+
 
 class SlugConverter(AbstractConverter, converter_name="slug"):
     """
@@ -175,6 +311,268 @@ class SlugConverter(AbstractConverter, converter_name="slug"):
         match = SlugConverter.slug_regex.match(value)
         return (True, {self.identifier: value}) if match else REFUSED
 
+    def to_url(self, value: str) -> Optional[str]:
+        return value if SlugConverter.slug_regex.match(value) else None
+
+
+class DateConverter(AbstractConverter, converter_name="date", segments=3):
+    """
+    A converter that matches dates written as `year/month/day`, over three components.
+
+    >>> converter = DateConverter("<date:day>", "day")
+    >>> converter.accepts("2015/04/12")
+    (True, {'day': datetime.date(2015, 4, 12)})
+    >>> converter.accepts("2015/02/30")
+    (False, {})
+    >>> converter.accepts("2015/04")
+    (False, {})
+    >>> converter.to_url("2015-04-12")
+    '2015/04/12'
+    """
+
+    def accepts(self, value: str) -> Tuple[bool, dict]:
+        match = DATE.fullmatch(value)
+        if match is None:
+            return REFUSED
+
+        year, month, day = match.groups()
+        try:
+            return (True, {self.identifier: date(int(year), int(month), int(day))})
+        except ValueError:
+            return REFUSED
+
+    def to_url(self, value: str) -> Optional[str]:
+        # Dates are given as their `str`, in the ISO format.
+        accepts, accepted = self.accepts(value.replace("-", PATH_DELIMITER))
+        if not accepts:
+            return None
+
+        day = accepted[self.identifier]
+        return f"{day.year:04d}/{day.month:02d}/{day.day:02d}"
+
+
+class ChoiceConverter(AbstractConverter, converter_name="choice"):
+    """
+    A converter that matches one of a fixed set of values.
+    The accepted values follow the identifier, separated by `|`.
+
+    >>> converter = ChoiceConverter("<choice:lang:en|fr|de>", "lang:en|fr|de")
+    >>> converter.accepts("fr")
+    (True, {'lang': 'fr'})
+    >>> converter.accepts("es")
+    (False, {})
+    """
+
+    def __init__(self, description: str, identifier: str) -> None:
+        identifier, delimiter, choices = identifier.partition(DESCRIPTION_DELIMITER)
+        if not delimiter or not choices:
+            raise RouterConfigurationError(
+                f"No choices provided for the choice converter '{description}'."
+            )
+
+        super().__init__(description, identifier)
+        self.choices: FrozenSet[str] = frozenset(choices.split(CHOICE_DELIMITER))
+
+    def accepts(self, value: str) -> Tuple[bool, dict]:
+        return (True, {self.identifier: value}) if value in self.choices else REFUSED
+
+    def to_url(self, value: str) -> Optional[str]:
+        return value if value in self.choices else None
+
+
+def literal_prefix(pattern: str) -> str:
+    r"""
+    Returns the literal text that every match of `pattern` starts with.
+    The result is conservative: an empty string means no prefix could be inferred.
+
+    >>> literal_prefix(r"page-(?P<page>\d+)$")
+    'page-'
+    >>> literal_prefix(r"^v1-(?P<rest>.*)")
+    'v1-'
+    >>> literal_prefix(r"abc?")
+    'ab'
+    >>> literal_prefix(r"(?P<match>^[a-z]*$)")
+    ''
+    >>> literal_prefix(r"en|fr")
+    ''
+    """
+
+    if "|" in pattern:
+        return ""
+
+    prefix = []
+    for char in pattern[1:] if pattern.startswith("^") else pattern:
+        if char in REGEX_METACHARACTERS:
+            if char in "*?{" and prefix:
+                prefix.pop()
+            break
+        prefix.append(char)
+
+    return "".join(prefix)
+
+
+def is_vetted_regex(pattern: str) -> bool:
+    r"""
+    Checks that `pattern` belongs to a subset of regexes matched in polynomial time
+    of a low degree: no repetition may contain another repetition or an alternation,
+    repetitions of a variable length may not be followed by another one which
+    can match the same characters, unless characters they can't match come between,
+    and backreferences aren't allowed.
+
+    >>> is_vetted_regex(r"page-(?P<page>\d+)$")
+    True
+    >>> is_vetted_regex(r"(?P<word>[a-z]+(-[a-z]+)?)$")
+    True
+    >>> is_vetted_regex(r"(?P<word>(a+)+)$")
+    False
+    >>> is_vetted_regex(r"(?P<word>(a|ab)*)c")
+    False
+    >>> is_vetted_regex(r"(?P<twice>[a-z])(?P=twice)")
+    False
+    >>> is_vetted_regex(r"(?P<a>\w*\w*)$")
+    False
+    >>> is_vetted_regex(r"(?P<a>.*)-(?P<b>.*)$")
+    False
+    """
+
+    parsed = regex_parser.parse(pattern)
+    return is_vetted_subpattern(parsed, False) and scan_repeats(parsed, []) is not None
+
+
+REPEATS = {regex_parser.MAX_REPEAT, regex_parser.MIN_REPEAT}
+
+
+def is_vetted_subpattern(subpattern, repeated: bool) -> bool:
+    for op, av in subpattern:
+        if op in REPEATS:
+            low, high, item = av
+            if high > 1 and repeated:
+                return False
+            if not is_vetted_subpattern(item, repeated or high > 1):
+                return False
+        elif op == regex_parser.BRANCH:
+            if repeated:
+                return False
+            if not all(is_vetted_subpattern(item, repeated) for item in av[1]):
+                return False
+        elif op == regex_parser.SUBPATTERN:
+            if not is_vetted_subpattern(av[-1], repeated):
+                return False
+        elif op in (regex_parser.ASSERT, regex_parser.ASSERT_NOT):
+            if not is_vetted_subpattern(av[1], repeated):
+                return False
+        elif op in (regex_parser.GROUPREF, regex_parser.GROUPREF_EXISTS):
+            return False
+
+    return True
+
+
+# The characters sets of regexes are compared over these characters.
+ALPHABET = frozenset(chr(code) for code in range(0x800))
+CATEGORIES = {"DIGIT": r"\d", "SPACE": r"\s", "WORD": r"\w", "LINEBREAK": r"\n"}
+CATEGORY_CHARS: Dict[str, FrozenSet[str]] = {}
+
+
+def scan_repeats(subpattern, open_repeats: List[FrozenSet[str]]):
+    """
+    Returns the character sets of the repetitions of a variable length that
+    may still be matching once `subpattern` is matched after `open_repeats`,
+    or None if one of its repetitions overlaps one of them.
+    """
+
+    for op, av in subpattern:
+        if op in REPEATS:
+            low, high, item = av
+            if high > 1 and low != high:
+                chars = consumed_chars(item)
+                if any(chars & repeat for repeat in open_repeats):
+                    return None
+                open_repeats = [*absorbing(open_repeats, chars), chars]
+            elif high == 1:
+                matched = scan_repeats(item, open_repeats)
+                if matched is None:
+                    return None
+                open_repeats = matched if low else [*open_repeats, *matched]
+            elif high:
+                open_repeats = absorbing(open_repeats, consumed_chars(item))
+        elif op == regex_parser.SUBPATTERN:
+            matched = scan_repeats(av[-1], open_repeats)
+            if matched is None:
+                return None
+            open_repeats = matched
+        elif op == regex_parser.BRANCH:
+            branches = [scan_repeats(item, open_repeats) for item in av[1]]
+            if None in branches:
+                return None
+            open_repeats = [repeat for branch in branches for repeat in branch]
+        elif op in (regex_parser.ASSERT, regex_parser.ASSERT_NOT):
+            if scan_repeats(av[1], []) is None:
+                return None
+        else:
+            open_repeats = absorbing(open_repeats, consumed_chars([(op, av)]))
+
+    return open_repeats
+
+
+def absorbing(
+    open_repeats: List[FrozenSet[str]], chars: FrozenSet[str]
+) -> List[FrozenSet[str]]:
+    # Repetitions stay open while they can match what follows them.
+    return [repeat for repeat in open_repeats if chars <= repeat]
+
+
+def consumed_chars(subpattern) -> FrozenSet[str]:
+    """Returns the characters of `ALPHABET` that `subpattern` can match."""
+
+    chars: FrozenSet[str] = frozenset()
+    for op, av in subpattern:
+        if op == regex_parser.LITERAL:
+            chars |= {chr(av)}
+        elif op == regex_parser.NOT_LITERAL:
+            chars |= ALPHABET - {chr(av)}
+        elif op == regex_parser.ANY:
+            chars |= ALPHABET - {"\n"}
+        elif op == regex_parser.IN:
+            chars |= set_chars(av)
+        elif op == regex_parser.SUBPATTERN:
+            chars |= consumed_chars(av[-1])
+        elif op == regex_parser.BRANCH:
+            for item in av[1]:
+                chars |= consumed_chars(item)
+        elif op in REPEATS:
+            chars |= consumed_chars(av[2])
+
+    return chars
+
+
+def set_chars(items) -> FrozenSet[str]:
+    chars: FrozenSet[str] = frozenset()
+    for op, av in items:
+        if op == regex_parser.LITERAL:
+            chars |= {chr(av)}
+        elif op == regex_parser.RANGE:
+            chars |= {chr(code) for code in range(av[0], min(av[1], 0x7FF) + 1)}
+        elif op == regex_parser.CATEGORY:
+            chars |= category_chars(str(av))
+
+    if items and items[0][0] == regex_parser.NEGATE:
+        return ALPHABET - chars
+    return chars
+
+
+def category_chars(category: str) -> FrozenSet[str]:
+    chars = CATEGORY_CHARS.get(category)
+    if chars is None:
+        pattern = next(
+            (pattern for name, pattern in CATEGORIES.items() if name in category), "$^"
+        )
+        chars = frozenset(char for char in ALPHABET if re.match(pattern, char))
+        if "_NOT_" in category:
+            chars = ALPHABET - chars
+        chars = CATEGORY_CHARS[category] = chars
+
+    return chars
+
 
 def get_converters() -> Dict[str, Type[AbstractConverter]]:
     return CONVERTERS
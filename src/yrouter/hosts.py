@@ -0,0 +1,92 @@
+from typing import Any, Dict, Generic, List, Mapping, Optional, Tuple, TypeVar
+
+from .cache import LocalCache
+from .constants import HOST_DELIMITER, PORT_DELIMITER, START_DESCRIPTION
+from .converters import AbstractConverter
+from .utils import get_converter
+
+T = TypeVar("T")
+
+
+class HostDispatcher(Generic[T]):
+    """
+    Resolves a host to its target, e.g. a router, and the parameters captured from it.
+
+    Hosts without converters are looked up in a dict. Host patterns are split on `.`
+    and each label is described like a path component, e.g. `<slug:tenant>.example.com`;
+    they are tried in declaration order and their resolutions are cached per thread.
+    """
+
+    def __init__(self, targets: Mapping[str, T], cache_size: int = 1024) -> None:
+        self.targets = dict(targets)
+        self.exact: Dict[str, Tuple[T, Dict[str, Any]]] = {}
+        self.patterns: List[Tuple[Tuple[AbstractConverter, ...], T]] = []
+        self.cache: Optional[LocalCache[Tuple[T, Dict[str, Any]]]] = (
+            LocalCache(cache_size) if cache_size > 0 else None
+        )
+
+        for host, target in targets.items():
+            if START_DESCRIPTION not in host:
+                self.exact.setdefault(normalize_host(host), (target, {}))
+                continue
+
+            converters = tuple(
+                get_converter(
+                    label if label.startswith(START_DESCRIPTION) else label.lower()
+                )
+                for label in host.split(HOST_DELIMITER)
+            )
+            self.patterns.append((converters, target))
+
+    def resolve(self, host: str) -> Optional[Tuple[T, Dict[str, Any]]]:
+        host = normalize_host(host)
+        resolved = self.exact.get(host)
+        if resolved is not None or not self.patterns:
+            return resolved
+
+        cache = self.cache
+        if cache is not None:
+            resolved = cache.get(host)
+            if resolved is not None:
+                return resolved
+
+        resolved = self._match_patterns(host)
+        if resolved is not None and cache is not None:
+            cache.set(host, resolved)
+
+        return resolved
+
+    def _match_patterns(self, host: str) -> Optional[Tuple[T, Dict[str, Any]]]:
+        labels = host.split(HOST_DELIMITER)
+        for converters, target in self.patterns:
+            if len(converters) != len(labels):
+                continue
+
+            kwargs: Dict[str, Any] = {}
+            for converter, label in zip(converters, labels):
+                accepts, accepted = converter.accepts(label)
+                if not accepts:
+                    break
+                kwargs |= accepted
+            else:
+                return (target, kwargs)
+
+        return None
+
+
+def normalize_host(host: str) -> str:
+    """
+    Lowercases `host` and strips its port and trailing dot, if any.
+
+    >>> normalize_host("Tenant.Example.com.:8000")
+    'tenant.example.com'
+    >>> normalize_host("[::1]:8000")
+    '[::1]'
+    """
+
+    if host.startswith("["):
+        host = host[: host.find("]") + 1]
+    else:
+        host = host.partition(PORT_DELIMITER)[0]
+
+    return host.rstrip(HOST_DELIMITER).lower()
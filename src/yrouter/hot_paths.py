@@ -0,0 +1,125 @@
+import json
+import os
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+FORMAT_VERSION = 1
+QUERY_DELIMITER = "?"
+# The request line of the common and combined log formats, e.g. "GET /users/ HTTP/1.1"
+REQUEST_LINE = re.compile(r'"[A-Z]+ (\S+) HTTP/[\d.]+"')
+
+HotEntry = Tuple[str, int, Dict[str, Any]]
+
+
+def parse_access_log(lines: Iterable[str]) -> Iterator[str]:
+    """
+    Yields the paths requested in access log lines in the common or combined
+    log format, without their query strings. Other lines are skipped.
+
+    >>> lines = [
+    ...     '127.0.0.1 - - [19/Oct/2026:10:00:00 +0000] "GET /users/66/?a=1 HTTP/1.1" 200 5',
+    ...     'not a request',
+    ... ]
+    >>> list(parse_access_log(lines))
+    ['/users/66/']
+    """
+
+    for line in lines:
+        request = REQUEST_LINE.search(line)
+        if request:
+            yield request.group(1).partition(QUERY_DELIMITER)[0]
+
+
+class PathSampler:
+    """
+    Counts one in `1 / sample_rate` of the paths matched, to find the hot paths
+    of live traffic. Up to `maxsize` paths are kept, the least frequent half being
+    dropped when it's full.
+
+    Callers decrement `countdown` and call `record` once it reaches zero, so that
+    other calls only cost a decrement. Concurrent decrements may be lost, which
+    only makes sampling approximate.
+    """
+
+    def __init__(self, sample_rate: float, maxsize: int = 4096) -> None:
+        self.interval = max(1, round(1 / sample_rate))
+        self.maxsize = maxsize
+        self.countdown = 1
+        self.counts: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, path: str) -> None:
+        self.countdown = self.interval
+        with self._lock:
+            self.counts[path] += 1
+            if len(self.counts) > self.maxsize:
+                self.counts = Counter(dict(self.counts.most_common(self.maxsize // 2)))
+
+    def most_common(self, limit: int) -> List[Tuple[str, int]]:
+        """Returns the `limit` most sampled paths, with their counts."""
+
+        with self._lock:
+            return self.counts.most_common(limit)
+
+
+def dump(
+    file: Union[str, os.PathLike], fingerprint: bytes, entries: Iterable[HotEntry]
+) -> int:
+    """
+    Writes hot paths with the route index and keyword arguments they resolve to.
+    The file is replaced atomically so that processes loading it never read
+    a partial dump. Returns the number of entries written.
+    """
+
+    written: List[HotEntry] = [
+        entry
+        for entry in entries
+        if all(type(value) in (str, int) for value in entry[2].values())
+    ]
+    data = {
+        "format": FORMAT_VERSION,
+        "fingerprint": fingerprint.hex(),
+        "entries": written,
+    }
+
+    tmp = f"{os.fspath(file)}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, separators=(",", ":"))
+    os.replace(tmp, file)
+
+    return len(written)
+
+
+def load(file: Union[str, os.PathLike], fingerprint: bytes) -> Optional[List[HotEntry]]:
+    """
+    Reads hot paths dumped for the route table identified by `fingerprint`.
+    Returns `None` if the file is missing, unreadable or was dumped for other routes.
+    """
+
+    try:
+        with open(file) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(data, dict) or data.get("format") != FORMAT_VERSION:
+        return None
+    if data.get("fingerprint") != fingerprint.hex():
+        return None
+
+    entries = data.get("entries")
+    if not isinstance(entries, list):
+        return None
+
+    # Malformed entries are skipped, the other ones can still be restored.
+    return [tuple(entry) for entry in entries if is_entry(entry)]
+
+
+def is_entry(entry: Any) -> bool:
+    if not isinstance(entry, list) or len(entry) != 3:
+        return False
+
+    path, index, kwargs = entry
+    return isinstance(path, str) and type(index) is int and isinstance(kwargs, dict)
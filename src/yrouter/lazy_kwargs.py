@@ -0,0 +1,75 @@
+from typing import Any, Dict, Iterator, Mapping
+
+from .converters import AbstractConverter
+
+MISSING = object()
+
+
+class LazyKwargs(Mapping):
+    """
+    The keyword arguments of a match, as captured from the path, converted by their
+    converters when first read. Converted values are kept, so that the copies of
+    a cached match don't convert them again.
+
+    >>> from yrouter.converters import UUIDConverter
+    >>> kwargs = LazyKwargs(
+    ...     {"id": "20bfa7b2-50a5-11ec-83dc-479fd603abba", "slug": "a-slug"},
+    ...     {"id": UUIDConverter("<uuid:id>", "id")},
+    ...     native=True,
+    ... )
+    >>> kwargs["slug"]
+    'a-slug'
+    >>> kwargs
+    {'id': UUID('20bfa7b2-50a5-11ec-83dc-479fd603abba'), 'slug': 'a-slug'}
+
+    Unlike `dict`, it's read-only: copies of a match share it.
+
+    >>> kwargs.copy() is kwargs
+    True
+    """
+
+    __slots__ = ("values", "converters", "native", "converted")
+
+    def __init__(
+        self,
+        values: Dict[str, Any],
+        converters: Dict[str, AbstractConverter],
+        native: bool = False,
+    ) -> None:
+        self.values = values
+        self.converters = converters
+        self.native = native
+        self.converted: Dict[str, Any] = {}
+
+    def __getitem__(self, key: str) -> Any:
+        converter = self.converters.get(key)
+        if converter is None:
+            return self.values[key]
+
+        value = self.converted.get(key, MISSING)
+        if value is MISSING:
+            value = self.converted[key] = converter.convert(
+                self.values[key], self.native
+            )
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.values)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.values
+
+    def __ror__(self, other: Mapping[str, Any]) -> "LazyKwargs":
+        # Merged after `other`, as for `dict`, without converting any value.
+        merged = LazyKwargs({**other, **self.values}, self.converters, self.native)
+        merged.converted = self.converted.copy()
+        return merged
+
+    def copy(self) -> "LazyKwargs":
+        return self
+
+    def __repr__(self):
+        return repr(dict(self))
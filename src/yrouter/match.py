@@ -1,4 +1,4 @@
-from typing import Any, Dict, Optional
+from typing import Any, Callable, FrozenSet, Mapping, Optional
 
 from .route_node import RouteNode
 
@@ -12,35 +12,72 @@ class Match:
 
 
 class FullMatch(Match):
-    __slots__ = ("should_redirect", "redirect_to")
+    __slots__ = ("should_redirect", "redirect_to", "canonical_path", "handler")
 
     def __init__(
         self,
         node: RouteNode,
-        kwargs: Dict[str, Any],
+        kwargs: Mapping[str, Any],
         should_redirect: bool,
         redirect_to: Optional[str] = None,
+        canonical_path: Optional[str] = None,
+        handler: Optional[Callable[..., Any]] = None,
     ) -> None:
         super().__init__(node, kwargs)
         self.should_redirect = should_redirect
         self.redirect_to = redirect_to
+        self.canonical_path = canonical_path
+        # The handler resolved for the requested HTTP method, if any.
+        self.handler = node.handler if handler is None else handler
 
-    @property
-    def handler(self):
-        return self.node.handler
+    def copy(self) -> "FullMatch":
+        return FullMatch(
+            self.node,
+            # Lazy keyword arguments are read-only and shared.
+            self.kwargs.copy(),
+            self.should_redirect,
+            self.redirect_to,
+            self.canonical_path,
+            self.handler,
+        )
 
     @property
     def handler_name(self):
         return self.node.name
 
     def __repr__(self):
-        handler_name = self.handler_name if self.handler_name else self.handler.__name__
+        handler_name = self.handler_name or getattr(
+            self.handler, "__name__", self.handler
+        )
         return (
             f"<FullMatch: handler={handler_name}, "
             f"kwargs={self.kwargs}, should_redirect={self.should_redirect}>"
         )
 
 
+class MethodNotAllowed(Match):
+    """
+    The result of matching a path whose route doesn't handle the requested HTTP method.
+    One instance is precomputed per route, holding the methods it allows.
+    """
+
+    __slots__ = ("allowed_methods",)
+
+    def __init__(self, node: RouteNode, allowed_methods: FrozenSet[str]) -> None:
+        super().__init__(node, None)
+        self.allowed_methods = allowed_methods
+
+    @property
+    def handler_name(self):
+        return self.node.name
+
+    def __repr__(self):
+        return f"<MethodNotAllowed: allowed_methods={sorted(self.allowed_methods)}>"
+
+    def __bool__(self):
+        return False
+
+
 class _NoMatch(Match):
     def __repr__(self):
         return "<NoMatch>"
@@ -50,3 +87,10 @@ class _NoMatch(Match):
 
 
 NoMatch = _NoMatch(None, None)
+
+
+class Miss(_NoMatch):
+    """
+    A `NoMatch` remembering the deepest node reached.
+    It's only used internally by routers, which return `NoMatch` instead.
+    """
@@ -0,0 +1,152 @@
+import hashlib
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .route_node import RouteNode, handler_identity
+from .stats import node_paths
+
+SELF = b"self"
+
+
+def subtree_digest(
+    node: RouteNode, memo: Optional[Dict[RouteNode, bytes]] = None
+) -> bytes:
+    """
+    Returns a hash of the structure of the subtree of `node`: the components,
+    names and handlers of its nodes, see `handler_identity`, in order.
+    Digests of frozen subtrees are kept on their root.
+    """
+
+    if node.digest is not None:
+        return node.digest
+    if memo is not None and node in memo:
+        return memo[node]
+
+    digest = hashlib.sha256(
+        repr((node.component, node.name, handler_identity(node.handler))).encode()
+    )
+    for child in node.children:
+        # Nodes of `path` converters are their own children.
+        digest.update(SELF if child is node else subtree_digest(child, memo))
+
+    value = digest.digest()
+    if isinstance(node.children, tuple):
+        node.digest = value
+    elif memo is not None:
+        memo[node] = value
+    return value
+
+
+def reuse_subtrees(
+    node: RouteNode,
+    previous: Dict[bytes, List[RouteNode]],
+    used: Set[RouteNode],
+    memo: Optional[Dict[RouteNode, bytes]] = None,
+) -> RouteNode:
+    """
+    Returns the subtree of `node`, reusing a subtree of `previous` having the same
+    digest, see `adopt_handlers`, or built of new nodes otherwise, whose children
+    are replaced the same way. Subtrees are reused once, their nodes added to `used`.
+    Neither `node` nor the subtrees of `previous` are modified.
+    """
+
+    for reused in previous.get(subtree_digest(node, memo), ()):
+        if reused not in used:
+            return adopt_handlers(reused, node, previous, used, memo)
+
+    # Frozen subtrees are compiled already.
+    if isinstance(node.children, tuple):
+        return node
+
+    copy = RouteNode(node.converter, node.handler, node.name)
+    copy.children = [
+        copy if child is node else reuse_subtrees(child, previous, used, memo)
+        for child in node.children
+    ]
+    return copy
+
+
+def adopt_handlers(
+    target: RouteNode,
+    source: RouteNode,
+    previous: Dict[bytes, List[RouteNode]],
+    used: Set[RouteNode],
+    memo: Optional[Dict[RouteNode, bytes]] = None,
+) -> RouteNode:
+    """
+    Returns `target`, whose subtree has the structure of that of `source`, if its
+    nodes have the same handlers, and adds them to `used`. Otherwise, the nodes
+    whose handlers differ and their ancestors are copied with the handlers
+    of `source`, sharing the other nodes and the converters of `target`.
+    """
+
+    if target in used:
+        return reuse_subtrees(source, previous, used, memo)
+
+    used.add(target)
+    children = [
+        # Nodes of `path` converters are their own children.
+        None if child is target else adopt_handlers(child, new, previous, used, memo)
+        for child, new in zip(target.children, source.children)
+    ]
+    if same_handler(target.handler, source.handler) and all(
+        adopted is None or adopted is child
+        for adopted, child in zip(children, target.children)
+    ):
+        return target
+
+    copy = RouteNode(target.converter, source.handler, target.name)
+    copy.children = [copy if adopted is None else adopted for adopted in children]
+    return copy
+
+
+def same_handler(first: Any, second: Any) -> bool:
+    # Mappings of handlers are copied into dicts by `RouteNode.set_handler`.
+    if isinstance(first, dict) and isinstance(second, dict):
+        return first.keys() == second.keys() and all(
+            first[method] is handler for method, handler in second.items()
+        )
+
+    return first is second
+
+
+class RouteDiff:
+    """
+    The names of the routes added, removed and changed from one route table
+    to another, and the differences of the route tables of their hosts, by host.
+    """
+
+    __slots__ = ("added", "removed", "changed", "hosts")
+
+    def __init__(self, old: Optional[RouteNode], new: Optional[RouteNode]) -> None:
+        old_routes = named_routes(old) if old is not None else {}
+        new_routes = named_routes(new) if new is not None else {}
+        self.added = tuple(sorted(new_routes.keys() - old_routes.keys()))
+        self.removed = tuple(sorted(old_routes.keys() - new_routes.keys()))
+        self.changed = tuple(
+            sorted(
+                name
+                for name in old_routes.keys() & new_routes.keys()
+                if old_routes[name] != new_routes[name]
+            )
+        )
+        self.hosts: Dict[str, RouteDiff] = {}
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed or self.hosts)
+
+    def __repr__(self):
+        hosts = f"; hosts={self.hosts}" if self.hosts else ""
+        return (
+            f"<RouteDiff: added={list(self.added)}; removed={list(self.removed)}; "
+            f"changed={list(self.changed)}{hosts}>"
+        )
+
+
+def named_routes(tree: RouteNode) -> Dict[str, Tuple[str, Any]]:
+    """Returns the path and handler identity of each named route of `tree`."""
+
+    return {
+        node.name: (path, handler_identity(node.handler))
+        for node, path in node_paths(tree).items()
+        if node.name and node.handler is not None
+    }
@@ -1,7 +1,7 @@
-from typing import Any, Callable, Optional, Sequence
+from typing import Optional, Sequence, Union
 
 from .converters import ExactConverter
-from .route_node import RouteNode
+from .route_node import Handler, RouteNode
 from .utils import add_child_routes, get_components, get_converter
 
 HANDLER_NAMES = set()
@@ -9,9 +9,9 @@ HANDLER_NAMES = set()
 
 def route(
     path: str,
-    handler: Optional[Callable[..., Any]] = None,
+    handler: Optional[Handler] = None,
     name: Optional[str] = None,
-    subroutes: Optional[Sequence[RouteNode]] = None,
+    subroutes: Optional[Sequence["Route"]] = None,
 ) -> RouteNode:
 
     components = get_components(path)
@@ -26,7 +26,7 @@ def route(
             node.finalize()
         node = child
 
-    node.handler = handler
+    node.set_handler(handler)
     if name:
         node.name = name
         HANDLER_NAMES.add(name)
@@ -38,3 +38,54 @@ def route(
         node.finalize()
 
     return root
+
+
+class LazyRoute:
+    """
+    A route declared with `lazy_route`, parsed into nodes when a router is built
+    from it.
+    """
+
+    __slots__ = ("path", "handler", "name", "subroutes")
+
+    def __init__(
+        self,
+        path: str,
+        handler: Optional[Handler] = None,
+        name: Optional[str] = None,
+        subroutes: Optional[Sequence["Route"]] = None,
+    ) -> None:
+        self.path = path
+        self.handler = handler
+        self.name = name
+        self.subroutes = subroutes
+
+    def materialize(self) -> RouteNode:
+        return route(self.path, self.handler, self.name, self.subroutes)
+
+    def __repr__(self):
+        return f"<LazyRoute: path={self.path}; name={self.name}>"
+
+
+Route = Union[RouteNode, LazyRoute]
+
+
+def lazy_route(
+    path: str,
+    handler: Optional[Handler] = None,
+    name: Optional[str] = None,
+    subroutes: Optional[Sequence[Route]] = None,
+) -> LazyRoute:
+    """
+    Declares a route like `route`, but only stores its path: parsing it and
+    compiling its converters is left to the first router built from it, which
+    is deferred as well for routers created with `lazy=True`.
+
+    >>> lazy_route("users/<int:id>/", name="user-details")
+    <LazyRoute: path=users/<int:id>/; name=user-details>
+    """
+
+    if name:
+        HANDLER_NAMES.add(name)
+
+    return LazyRoute(path, handler, name, subroutes)
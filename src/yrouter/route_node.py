@@ -1,74 +1,544 @@
-from functools import lru_cache
-from typing import Any, Callable, Dict, List, Optional, Tuple
+import re
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 from .constants import END_DESCRIPTION, PATH_DELIMITER, START_DESCRIPTION
-from .converters import AbstractConverter
+from .converters import (
+    AbstractConverter,
+    ChoiceConverter,
+    DateConverter,
+    ExactConverter,
+    IntConverter,
+    PathConverter,
+    RegexConverter,
+    SlugConverter,
+    StringConverter,
+    UUIDConverter,
+)
 
 NONE_TUPLE = (None, None)
+GROUP_NAME = re.compile(r"(?<!\\)\(\?P<([A-Za-z_]\w*)>")
+# Backreferences, conditionals and inline global flags can't be safely
+# embedded into an alternation.
+UNMERGEABLE = re.compile(r"\(\?P=|\(\?\(|\\[1-9]|\(\?[aiLmsux]+\)")
+
+Matched = Optional[Tuple["RouteNode", Dict[str, Any]]]
+Matcher = Callable[[str], Matched]
+Domain = Union[FrozenSet[str], AbstractConverter, None]
+Handler = Union[Callable[..., Any], Mapping[str, Callable[..., Any]]]
+# Converters whose `accepts` is cheap and side-effect free, which can be called
+# on routes' values when building a tree.
+BUILTIN_CONVERTERS = frozenset(
+    {
+        ChoiceConverter,
+        DateConverter,
+        ExactConverter,
+        IntConverter,
+        PathConverter,
+        RegexConverter,
+        SlugConverter,
+        StringConverter,
+        UUIDConverter,
+    }
+)
+
+
+class RegexAlternation:
+    """
+    Matches a run of sibling regex nodes with a single compiled regex.
+
+    Each pattern becomes a branch of the alternation, wrapped in a marker group,
+    and its named groups are renamed to avoid clashes between siblings.
+    Branches are tried in declaration order so the first accepting sibling wins,
+    just as if each regex was matched in turn.
+    """
+
+    __slots__ = ("regex", "prefixes", "branches")
+
+    def __init__(self, nodes: Sequence["RouteNode"]) -> None:
+        patterns = []
+        self.branches: Dict[str, Tuple["RouteNode", Tuple[Tuple[str, str], ...]]] = {}
+
+        for i, node in enumerate(nodes):
+            marker = f"_yr{i}"
+            groups = []
+
+            def rename(match):
+                groups.append(match.group(1))
+                return f"(?P<{marker}_{match.group(1)}>"
+
+            pattern = GROUP_NAME.sub(rename, node.converter.identifier)
+            patterns.append(f"(?P<{marker}>{pattern})")
+            self.branches[marker] = (
+                node,
+                tuple((f"{marker}_{group}", group) for group in groups),
+            )
+
+        self.regex = re.compile("|".join(patterns))
+        prefixes = tuple(node.converter.prefix for node in nodes)
+        self.prefixes = prefixes if all(prefixes) else None
+
+    def __call__(self, value: str) -> Matched:
+        if self.prefixes and not value.startswith(self.prefixes):
+            return None
+
+        match = self.regex.match(value)
+        if match is None:
+            return None
+
+        node, groups = self.branches[match.lastgroup]
+        return (node, {group: match.group(renamed) for renamed, group in groups})
+
+
+class StaticIndex:
+    """
+    Matches a run of sibling exact and choice nodes with a single dict lookup.
+
+    Every value accepted by one of the nodes is mapped to that node and its
+    captured parameters. When several nodes accept the same value, the first
+    declared one wins.
+    """
+
+    __slots__ = ("index",)
+
+    def __init__(self, nodes: Sequence["RouteNode"]) -> None:
+        self.index: Dict[str, Tuple["RouteNode", Dict[str, Any]]] = {}
+
+        for node in nodes:
+            converter = node.converter
+            if isinstance(converter, ChoiceConverter):
+                for choice in converter.choices:
+                    self.index.setdefault(
+                        choice, (node, {converter.identifier: choice})
+                    )
+            else:
+                self.index.setdefault(converter.description, (node, {}))
+
+    def __call__(self, value: str) -> Matched:
+        return self.index.get(value)
+
+
+def accepting(node: "RouteNode") -> Matcher:
+    converter = node.converter
+    if converter.cache is not None:
+        accepts = converter.cache.wrap(converter)
+    else:
+        accepts = converter.validates if converter.converts else converter.accepts
+
+    # The annotations of nested functions are evaluated on each call.
+    def matcher(value: str) -> Matched:
+        accepted, kwargs = accepts(value)
+        return (node, kwargs) if accepted else None
+
+    return matcher
+
+
+def handler_identity(handler: Any) -> Any:
+    # Mappings of handlers are copied into dicts by `RouteNode.set_handler`.
+    if isinstance(handler, dict):
+        return sorted(
+            (method, handler_identity(method_handler))
+            for method, method_handler in handler.items()
+        )
+
+    if not handler:
+        return handler
+
+    # Stable across processes, unlike `id`, and telling apart lambdas
+    # and handlers of the same name declared in different modules.
+    code = getattr(handler, "__code__", None)
+    return (
+        getattr(handler, "__module__", None),
+        getattr(handler, "__qualname__", repr(handler)),
+        code and (code.co_filename, code.co_firstlineno),
+    )
+
+
+def is_mergeable(node: "RouteNode") -> bool:
+    return type(node.converter) is RegexConverter and not UNMERGEABLE.search(
+        node.converter.identifier
+    )
+
+
+def is_static(node: "RouteNode") -> bool:
+    return type(node.converter) in (ExactConverter, ChoiceConverter)
+
+
+def compile_matchers(
+    children: Sequence["RouteNode"], adaptive: bool = False
+) -> Tuple[Matcher, ...]:
+    """
+    Groups consecutive exact and choice siblings into a `StaticIndex` and
+    consecutive mergeable regex siblings into a `RegexAlternation`.
+    If `adaptive` is set, consecutive matchers accepting disjoint sets of values
+    are grouped into an `AdaptiveGroup`.
+    """
+
+    # Each matcher is paired with what it accepts, see `are_disjoint`.
+    units: List[Tuple[Matcher, Domain]] = []
+    run: List["RouteNode"] = []
+    run_kind = None
+
+    def flush():
+        if not run:
+            return
+
+        if run_kind is is_static:
+            index = StaticIndex(run)
+            units.append((index, frozenset(index.index)))
+        elif len(run) > 1:
+            try:
+                units.append((RegexAlternation(run), None))
+            except re.error:
+                units.extend((accepting(node), node.converter) for node in run)
+        else:
+            units.extend((accepting(node), node.converter) for node in run)
+        run.clear()
+
+    for child in children:
+        kind = next((kind for kind in (is_static, is_mergeable) if kind(child)), None)
+        if kind is None or kind is not run_kind:
+            flush()
+            run_kind = kind
+
+        if kind is None:
+            units.append((accepting(child), child.converter))
+        else:
+            run.append(child)
+    flush()
+
+    if not adaptive:
+        return tuple(matcher for matcher, _ in units)
+
+    matchers: List[Matcher] = []
+    group: List[Tuple[Matcher, Domain]] = []
+    for unit in units + [(None, None)]:
+        if unit[0] is not None and all(
+            are_disjoint(unit[1], domain) for _, domain in group
+        ):
+            group.append(unit)
+            continue
+
+        if len(group) > 1:
+            matchers.append(AdaptiveGroup([matcher for matcher, _ in group]))
+        else:
+            matchers.extend(matcher for matcher, _ in group)
+        group = [unit]
+
+    return tuple(matchers)
+
+
+def compile_spans(
+    children: Sequence["RouteNode"], adaptive: bool = False
+) -> Tuple[Tuple[int, Matcher], ...]:
+    """
+    Pairs the matchers of `children` with the number of components they match,
+    runs of children matching a single component being compiled together.
+    """
+
+    spans: List[Tuple[int, Matcher]] = []
+    run: List["RouteNode"] = []
+    for child in children:
+        if child.converter.segments == 1:
+            run.append(child)
+            continue
+
+        spans.extend((1, matcher) for matcher in compile_matchers(run, adaptive))
+        spans.append((child.converter.segments, accepting(child)))
+        run = []
+    spans.extend((1, matcher) for matcher in compile_matchers(run, adaptive))
+
+    return tuple(spans)
+
+
+def are_disjoint(first: Domain, second: Domain) -> bool:
+    """
+    Checks that no value can be accepted by both domains, a domain being either
+    the finite set of values accepted by a `StaticIndex` or the converter of a node.
+    Only provable cases are considered disjoint, and converters declared outside
+    yrouter are never called.
+
+    >>> from yrouter.converters import IntConverter, SlugConverter, StringConverter
+    >>> are_disjoint(IntConverter("<int:id>", "id"), StringConverter("<str:s>", "s"))
+    True
+    >>> are_disjoint(frozenset({"new", "top"}), IntConverter("<int:id>", "id"))
+    True
+    >>> are_disjoint(frozenset({"new", "top"}), SlugConverter("<slug:s>", "s"))
+    False
+    >>> are_disjoint(frozenset({"new"}), frozenset({"top"}))
+    True
+    """
+
+    if first is None or second is None:
+        return False
+
+    if isinstance(first, frozenset) and isinstance(second, frozenset):
+        return first.isdisjoint(second)
+
+    if isinstance(first, frozenset):
+        first, second = second, first
+    if isinstance(second, frozenset):
+        return type(first) in BUILTIN_CONVERTERS and not any(
+            first.accepts(value)[0] for value in second
+        )
+
+    # Digits and letters belong to distinct unicode categories.
+    return {type(first), type(second)} == {IntConverter, StringConverter}
+
+
+class AdaptiveGroup:
+    """
+    Matches a group of sibling matchers accepting disjoint sets of values,
+    trying first the ones that accepted the most values recently.
+
+    Since at most one matcher of the group accepts any value, the order in which
+    they're tried never changes the result. Acceptances are counted and every
+    `interval` calls, matchers are reordered and their counts halved so that
+    the order follows changes in traffic. Reordering swaps the whole sequence
+    of entries at once, so concurrent calls always see a consistent order;
+    concurrent increments may be lost, which only makes counts approximate.
+    """
+
+    __slots__ = ("entries", "calls", "interval")
+
+    def __init__(self, matchers: Sequence[Matcher], interval: int = 1024) -> None:
+        self.entries = tuple([matcher, 0] for matcher in matchers)
+        self.calls = 0
+        self.interval = interval
+
+    def __call__(self, value: str) -> Matched:
+        self.calls += 1
+        if self.calls >= self.interval:
+            self.reorder()
+
+        for entry in self.entries:
+            matched = entry[0](value)
+            if matched is not None:
+                entry[1] += 1
+                return matched
+
+        return None
+
+    def reorder(self) -> None:
+        entries = sorted(self.entries, key=lambda entry: -entry[1])
+        for entry in entries:
+            entry[1] //= 2
+        self.entries = tuple(entries)
+        self.calls = 0
 
 
 class RouteNode:
-    __slots__ = ("converter", "converter_name", "handler", "name", "children")
+    __slots__ = (
+        "converter",
+        "converter_name",
+        "handler",
+        "name",
+        "children",
+        "matchers",
+        "spans",
+        "allowed_methods",
+        "digest",
+        "adaptive",
+    )
 
     def __init__(
         self,
         converter: AbstractConverter,
-        handler: Optional[Callable[..., Any]] = None,
+        handler: Optional[Handler] = None,
         name: str = None,
-        children: Optional[List["RouteNode"]] = None,
+        children: Optional[Sequence["RouteNode"]] = None,
     ) -> None:
         self.converter = converter
         self.converter_name = converter.name
-        self.handler = handler
+        self.set_handler(handler)
         self.name = name
-        self.children = children if children else []
+        self.children = list(children) if children else []
+        self.matchers: Optional[Tuple[Matcher, ...]] = None
+        # Set on compilation if some children match several components at once.
+        self.spans: Optional[Tuple[Tuple[int, Matcher], ...]] = None
+        # The structural hash of the subtree, kept once its children are frozen.
+        self.digest: Optional[bytes] = None
+        # Set once compiled with adaptive matchers, owned by a single router.
+        self.adaptive = False
 
     @property
     def component(self):
         return self.converter.description
 
-    @lru_cache
+    def set_handler(self, handler: Optional[Handler]) -> None:
+        """
+        Attaches a handler to this node; either a callable handling every
+        HTTP method or a mapping of HTTP methods to callables.
+        """
+
+        self.allowed_methods: Optional[FrozenSet[str]] = None
+        if isinstance(handler, Mapping):
+            handler = {
+                method.upper(): method_handler
+                for method, method_handler in handler.items()
+            }
+            self.allowed_methods = frozenset(handler)
+
+        self.handler = handler
+
     def match(
         self, path: str
     ) -> Tuple[Optional["RouteNode"], Optional[Dict[str, Any]]]:
-        for child in self.children:
-            accepts, kwargs = child.converter.accepts(path)
-            if accepts:
-                return (child, kwargs)
+        matchers = self.matchers
+        if matchers is None:
+            matchers = self.matchers = compile_matchers(self.children)
+
+        for matcher in matchers:
+            matched = matcher(path)
+            if matched is not None:
+                return matched
 
         return NONE_TUPLE
 
+    def match_segments(
+        self, components: Sequence[str], index: int
+    ) -> Tuple[Optional["RouteNode"], Optional[Dict[str, Any]], int]:
+        """
+        Matches the children of this node against the components starting at `index`,
+        some children matching several components at once.
+        Returns the matched child, its keyword arguments and the number of
+        components it matched.
+        """
+
+        if self.spans is None:
+            matched_node, kwargs = self.match(components[index])
+            return matched_node, kwargs, 1
+
+        for segments, matcher in self.spans:
+            if segments == 1:
+                matched = matcher(components[index])
+            elif index + segments <= len(components):
+                matched = matcher(
+                    PATH_DELIMITER.join(components[index : index + segments])
+                )
+            else:
+                continue
+
+            if matched is not None:
+                return matched[0], matched[1], segments
+
+        return None, None, 1
+
+    def compile(self, adaptive: bool = False) -> "RouteNode":
+        """
+        Precomputes the matchers of this node and all its descendants and freezes
+        their children, so that a compiled tree can be read concurrently without locks.
+        Returns the compiled tree.
+
+        Frozen subtrees compiled by another router are shared as is, their matchers
+        being stateless. Adaptive matchers count the values they accept, so adaptive
+        trees are compiled on a copy of the nodes, and subtrees compiled by
+        an adaptive router are copied before being compiled again.
+        """
+
+        root = self.copy() if adaptive or self.adaptive else self
+        seen = set()
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            if node in seen or isinstance(node.children, tuple):
+                continue
+
+            seen.add(node)
+            node.children = tuple(
+                child.copy() if child.adaptive else child for child in node.children
+            )
+            node.matchers = compile_matchers(node.children, adaptive)
+            if any(child.converter.segments > 1 for child in node.children):
+                node.spans = compile_spans(node.children, adaptive)
+            node.adaptive = adaptive
+            stack.extend(node.children)
+
+        return root
+
+    def copy(self) -> "RouteNode":
+        """Returns an uncompiled copy of this node and its descendants."""
+
+        copies: Dict[RouteNode, RouteNode] = {}
+
+        def copy_node(node: RouteNode) -> RouteNode:
+            # Nodes of `path` converters are their own children.
+            copied = copies.get(node)
+            if copied is None:
+                copied = copies[node] = RouteNode(
+                    node.converter, node.handler, node.name
+                )
+                copied.children = [copy_node(child) for child in node.children]
+            return copied
+
+        return copy_node(self)
+
+    def walk(self) -> Iterator["RouteNode"]:
+        """Yields this node and its descendants once each, in declaration order."""
+
+        seen = set()
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if node in seen:
+                continue
+
+            seen.add(node)
+            yield node
+            stack.extend(reversed(node.children))
+
     def find(self, handler_name: str, **kwargs) -> Optional[str]:
+        return self._find(handler_name, kwargs, ())
+
+    def _find(
+        self, handler_name: str, kwargs: Dict[str, Any], consumed: Tuple[str, ...]
+    ) -> Optional[str]:
+        # `kwargs` is shared by the whole search and never mutated; the identifiers
+        # already used by ancestors are tracked in `consumed` instead.
         component, converter = self.component, self.converter
         if component.startswith(START_DESCRIPTION) and component.endswith(
             END_DESCRIPTION
         ):
 
             if self.converter_name != "re":
-                if (identifier := converter.identifier) not in kwargs:
+                identifier = converter.identifier
+                if identifier not in kwargs or identifier in consumed:
                     return None
 
-                accepts, accepted = converter.accepts(str(kwargs[identifier]))
-                if not accepts:
+                component = converter.to_url(str(kwargs[identifier]))
+                if component is None:
                     return None
 
-                kwargs.pop(identifier)
-                component = str(accepted[identifier])
+                consumed += (identifier,)
 
             else:
                 for identifier, value in kwargs.items():
+                    if identifier in consumed:
+                        continue
+
                     accepts, accepted = converter.accepts(str(value))
                     if accepts and identifier in accepted:
-                        kwargs.pop(identifier)
+                        consumed += (identifier,)
                         component = str(accepted[identifier])
                         break
 
         matched = component + PATH_DELIMITER
-        if self.handler and self.name == handler_name and not kwargs:
+        if self.handler and self.name == handler_name and len(consumed) == len(kwargs):
             return matched
 
         for child in self.children:
-            found = child.find(handler_name, **kwargs)
+            found = child._find(handler_name, kwargs, consumed)
             if found:
                 return matched + found
 
@@ -1,66 +1,810 @@
-from typing import Any, Dict, Optional, Sequence
+import hashlib
+import os
+import threading
+from array import array
+from collections import Counter
+from time import perf_counter
+from typing import (
+    Any,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
 
-from .constants import PATH_DELIMITER
+from . import hot_paths
+from .cache import LocalCache
+from .classification import INDEX_TYPECODE, NO_ROUTE, Classification
+from .constants import NORMALIZE, PATH_DELIMITER, PERCENT, SLASH_POLICIES, STRICT
+from .converters import AbstractConverter, RegexConverter, is_vetted_regex
 from .exceptions import RouterConfigurationError
-from .match import FullMatch, Match, NoMatch
-from .route import HANDLER_NAMES, route
+from .hosts import HostDispatcher
+from .lazy_kwargs import LazyKwargs
+from .match import FullMatch, Match, MethodNotAllowed, Miss, NoMatch
+from .rebuild import RouteDiff, reuse_subtrees, subtree_digest
+from .route import HANDLER_NAMES, LazyRoute, Route, route
 from .route_node import RouteNode
-from .utils import add_child_routes, get_components
+from .shared_cache import SharedMatchCache
+from .stats import RouteStats, node_paths, prometheus
+from .url_builder import URLBuilder
+from .utils import (
+    add_child_routes,
+    get_components,
+    normalize_path,
+    overlay_routes,
+    static_paths,
+    unquote_segments,
+)
 
 
 class Router:
-    def __init__(self, routes: Sequence[RouteNode], append_slash: bool = True) -> None:
+    def __init__(
+        self,
+        routes: Sequence[Route],
+        append_slash: bool = True,
+        cache_size: int = 1024,
+        shared_cache: Optional[SharedMatchCache] = None,
+        slash_policy: str = "redirect",
+        hosts: Optional[Mapping[str, Sequence[Route]]] = None,
+        stats: bool = False,
+        sample_rate: float = 0.01,
+        max_path_length: Optional[int] = None,
+        max_segments: Optional[int] = None,
+        vetted_regexes: bool = False,
+        adaptive: bool = False,
+        lazy: bool = False,
+        lazy_kwargs: bool = False,
+        native_uuids: bool = False,
+        hot_path_sample_rate: float = 0,
+    ) -> None:
         if not routes:
             raise RouterConfigurationError(
                 "Trying to initialize router with empty routes."
             )
 
-        self.tree = self._build_tree(routes)
+        if slash_policy not in SLASH_POLICIES:
+            raise RouterConfigurationError(
+                f"Unknown slash policy '{slash_policy}', "
+                f"expected one of: {', '.join(SLASH_POLICIES)}."
+            )
+
+        # The settings inherited by the routers of hosts and overlays.
+        self.options: Dict[str, Any] = {
+            "append_slash": append_slash,
+            "cache_size": cache_size,
+            "slash_policy": slash_policy,
+            "max_path_length": max_path_length,
+            "max_segments": max_segments,
+            "vetted_regexes": vetted_regexes,
+            "adaptive": adaptive,
+            "lazy_kwargs": lazy_kwargs,
+            "native_uuids": native_uuids,
+            "hot_path_sample_rate": hot_path_sample_rate,
+        }
         self.append_slash = append_slash
+        self.slash_policy = slash_policy
+        self.max_path_length = max_path_length
+        self.max_segments = max_segments
+        self.lazy_kwargs = lazy_kwargs
+        self.native_uuids = native_uuids
+        self.sample_rate = sample_rate
+
+        # What's left to build the router, until it's frozen.
+        self.pending: Optional[Tuple[Any, ...]] = (routes, shared_cache, hosts, stats)
+        self.frozen = False
+        self.freeze_lock = threading.RLock()
+        if not lazy:
+            self.freeze()
+
+    def freeze(self) -> None:
+        """
+        Builds the tree of a router created with `lazy=True`, which is otherwise
+        built on first use. Does nothing if the router is already built.
+        """
+
+        with self.freeze_lock:
+            pending = self.pending
+            if pending is None:
+                return
+
+            self.pending = None
+            try:
+                self._build(*pending)
+            except BaseException:
+                self.pending = pending
+                raise
+
+            self.frozen = True
+
+    def _ensure_built(self) -> None:
+        # Threads using a lazy router while it's being built wait for the build
+        # to finish, instead of reading the attributes set so far.
+        if not self.frozen:
+            self.freeze()
+
+    def _build(
+        self,
+        routes: Sequence[Route],
+        shared_cache: Optional[SharedMatchCache],
+        hosts: Optional[Mapping[str, Sequence[Route]]],
+        stats: bool,
+    ) -> None:
+        options = self.options
+        self.tree = self._build_tree(routes).compile(options["adaptive"])
+        self.cache: Optional[LocalCache[Match]] = (
+            LocalCache(options["cache_size"]) if options["cache_size"] > 0 else None
+        )
+
+        self.tree_nodes: Tuple[RouteNode, ...] = tuple(self.tree.walk())
+        self.tree_indices: Dict[RouteNode, int] = {
+            node: index for index, node in enumerate(self.tree_nodes)
+        }
+        if options["vetted_regexes"]:
+            for node in self.tree_nodes:
+                if isinstance(node.converter, RegexConverter) and not is_vetted_regex(
+                    node.converter.identifier
+                ):
+                    raise RouterConfigurationError(
+                        f"The regex of '{node.component}' may backtrack catastrophically."
+                    )
+
+        self.nodes: Tuple[RouteNode, ...] = tuple(
+            node for node in self.tree_nodes if node.handler is not None
+        )
+        # The converters of values captured unconverted, indexed for the shared cache.
+        self.converters: Tuple[AbstractConverter, ...] = tuple(
+            dict.fromkeys(
+                node.converter for node in self.tree_nodes if node.converter.converts
+            )
+        )
+        self.converter_indices: Dict[AbstractConverter, int] = {
+            converter: index for index, converter in enumerate(self.converters)
+        }
+        self.indices: Dict[RouteNode, int] = {
+            node: index for index, node in enumerate(self.nodes)
+        }
+        self.not_allowed: Dict[RouteNode, MethodNotAllowed] = {
+            node: MethodNotAllowed(node, node.allowed_methods)
+            for node in self.nodes
+            if node.allowed_methods is not None
+        }
+        self.builders: Dict[str, URLBuilder] = {}
+        # Read-only once installed, so that every thread can look it up without locking.
+        self.hot_paths: Dict[str, FullMatch] = {}
+        self.path_sampler: Optional[hot_paths.PathSampler] = (
+            hot_paths.PathSampler(options["hot_path_sample_rate"])
+            if options["hot_path_sample_rate"]
+            else None
+        )
+
+        # The nodes reached by walking past a converter with a `cache_size`: their
+        # matches and misses are left out of the match caches, so that they follow
+        # the invalidation and expiry of the converter's cache.
+        self.volatile_nodes: FrozenSet[RouteNode] = frozenset(
+            descendant
+            for node in self.tree_nodes
+            if any(child.converter.cache is not None for child in node.children)
+            for descendant in node.walk()
+        )
+
+        self.route_stats: Optional[RouteStats] = None
+        # Misses of volatile nodes are always kept, to tell them from other misses.
+        self.misses: Dict[RouteNode, Miss] = {
+            node: Miss(node, None) for node in self.volatile_nodes
+        }
+        if stats:
+            self.route_stats = RouteStats(
+                self.nodes, self.tree_nodes, node_paths(self.tree), self.sample_rate
+            )
+            self.misses = {node: Miss(node, None) for node in self.tree_nodes}
+
+        # Static routes are resolved once by walking the tree, so that the results
+        # follow the same precedence rules, and are then never walked again.
+        self.static_paths: Dict[str, FullMatch] = {}
+        for path in static_paths(self.tree):
+            for variant in (path, path.rstrip(PATH_DELIMITER)):
+                match = self._match(variant)
+                if match and match.node not in self.volatile_nodes:
+                    self.static_paths[variant] = match
+        self.precomputed: Dict[str, FullMatch] = dict(self.static_paths)
+
+        self.shared_cache = shared_cache
+        if shared_cache is not None:
+            shared_cache.bind(self.fingerprint())
+
+        self.hosts: Optional[HostDispatcher[Router]] = None
+        if hosts:
+            # Hosts given the same routes share a router, and routers share the
+            # subtrees of the routes they have in common.
+            routers: Dict[int, Router] = {}
+            targets: Dict[str, Router] = {}
+            for host, host_routes in hosts.items():
+                if id(host_routes) not in routers:
+                    routers[id(host_routes)] = Router(
+                        host_routes,
+                        stats=stats,
+                        sample_rate=self.sample_rate,
+                        **self.options,
+                    )
+                targets[host] = routers[id(host_routes)]
+
+            self.hosts = HostDispatcher(targets, options["cache_size"])
+
+    def _build_tree(self, routes: Sequence[Route]) -> RouteNode:
+        # The root is copied so that the given routes are never mutated
+        # and can be shared between routers.
+        first = routes[0]
+        if isinstance(first, LazyRoute):
+            first = first.materialize()
+
+        if first.converter.description != "":
+            root, children = route(""), [first, *routes[1:]]
+        else:
+            root, children = first, routes[1:]
+
+        tree = RouteNode(root.converter, root.handler, root.name, root.children)
+        return add_child_routes(tree, children)
+
+    def overlay(
+        self, extra_routes: Sequence[Route] = (), removed_names: Iterable[str] = ()
+    ) -> "Router":
+        """
+        Returns a router with the routes of this router, where `extra_routes`
+        override the handlers of the routes at the same paths or are added after
+        the routes of the same level, and the routes named in `removed_names` are removed.
+        The new router shares the nodes it doesn't modify with this router,
+        so an overlay costs as much memory and build time as its overrides.
+        The routers of hosts aren't overlaid: they're shared with this router.
+        """
+
+        self._ensure_built()
+        extra = self._build_tree(extra_routes) if extra_routes else None
+        tree = overlay_routes(self.tree, extra, frozenset(removed_names))
+
+        router = Router(
+            [tree],
+            stats=self.route_stats is not None,
+            sample_rate=self.sample_rate,
+            **self.options,
+        )
+        router.hosts = self.hosts
+        return router
+
+    def rebuild(
+        self,
+        routes: Sequence[Route],
+        hosts: Optional[Mapping[str, Sequence[Route]]] = None,
+    ) -> "Router":
+        """
+        Returns a router for `routes`, with the options of this router, reusing the
+        compiled subtrees of this router identical to subtrees of `routes`: with the
+        same components, names and handlers. Subtrees whose handlers were reloaded
+        are copied with the new handlers, sharing their compiled converters, so that
+        this router keeps matching with its own handlers.
+        The routers of `hosts` are rebuilt the same way from the routers of the same
+        hosts; they must be given again if this router has hosts.
+        """
+
+        self._ensure_built()
+        if self.hosts is not None and hosts is None:
+            raise RouterConfigurationError(
+                "The routes of the hosts of a router must be given to rebuild it."
+            )
+
+        previous: Dict[bytes, List[RouteNode]] = {}
+        for node in self.tree_nodes:
+            previous.setdefault(subtree_digest(node), []).append(node)
+
+        used: Set[RouteNode] = set()
+        memo: Dict[RouteNode, bytes] = {}
+        reused = [
+            reuse_subtrees(
+                route if isinstance(route, RouteNode) else route.materialize(),
+                previous,
+                used,
+                memo,
+            )
+            for route in routes
+        ]
+
+        router = Router(
+            reused,
+            stats=self.route_stats is not None,
+            sample_rate=self.sample_rate,
+            **self.options,
+        )
+        if hosts:
+            previous_routers = self.hosts.targets if self.hosts is not None else {}
+            routers: Dict[int, Router] = {}
+            targets: Dict[str, Router] = {}
+            for host, host_routes in hosts.items():
+                if id(host_routes) not in routers:
+                    previous_router = previous_routers.get(host)
+                    routers[id(host_routes)] = (
+                        previous_router.rebuild(host_routes, {})
+                        if previous_router is not None
+                        else Router(
+                            host_routes,
+                            stats=self.route_stats is not None,
+                            sample_rate=self.sample_rate,
+                            **self.options,
+                        )
+                    )
+                targets[host] = routers[id(host_routes)]
+
+            router.hosts = HostDispatcher(targets, self.options["cache_size"])
+        return router
+
+    def diff(self, other: "Router") -> RouteDiff:
+        """
+        Returns the names of the routes added, removed and changed in `other`,
+        and those of the routes of its hosts, by host.
+        """
+
+        self._ensure_built()
+        other._ensure_built()
+        diff = RouteDiff(self.tree, other.tree)
+
+        old_hosts = self.hosts.targets if self.hosts is not None else {}
+        new_hosts = other.hosts.targets if other.hosts is not None else {}
+        for host in {**old_hosts, **new_hosts}:
+            old, new = old_hosts.get(host), new_hosts.get(host)
+            host_diff = RouteDiff(
+                old.tree if old is not None else None,
+                new.tree if new is not None else None,
+            )
+            if host_diff:
+                diff.hosts[host] = host_diff
+        return diff
+
+    def fingerprint(self) -> bytes:
+        """
+        Returns a digest of the structure of the route table, stable across
+        processes running the same routes and changing whenever a route or an
+        option changing the results of matches changes. Handlers aren't part
+        of it, so that matches can be restored after handlers are redeployed.
+        """
+
+        self._ensure_built()
+        options = (
+            self.append_slash,
+            self.slash_policy,
+            self.max_path_length,
+            self.max_segments,
+            self.native_uuids,
+        )
+        digest = hashlib.sha256(repr(options).encode())
+        for node in self.tree.walk():
+            digest.update(
+                repr(
+                    (
+                        node.component,
+                        node.name,
+                        node.handler is not None,
+                        [child.component for child in node.children],
+                    )
+                ).encode()
+            )
+
+        return digest.digest()
+
+    def match(
+        self,
+        path: Union[str, bytes, memoryview],
+        method: Optional[str] = None,
+        host: Optional[str] = None,
+    ) -> Match:
+        """
+        Matches `path` against the routes. If an HTTP `method` is given, the handler
+        for this method is resolved in the same lookup; `MethodNotAllowed` is
+        returned if the matched route doesn't handle it.
+        A raw path, like the `raw_path` of an ASGI scope, can be given as bytes:
+        each of its segments is percent-decoded before being matched, so that
+        it's matched like the decoded path, except that encoded slashes don't
+        split segments. Its redirections are percent-encoded like the path.
+        If a `host` is given and matches one of the router's hosts, `path` is matched
+        against the routes of this host instead, and the parameters captured from
+        the host are added to the match's keyword arguments.
+        """
+
+        # `_ensure_built`, inlined.
+        if not self.frozen:
+            self.freeze()
+
+        if isinstance(path, str):
+            return self._dispatch(path, method, host, False)
+
+        try:
+            path = str(path, "utf-8")
+        except UnicodeDecodeError:
+            return NoMatch
+
+        if PERCENT not in path:
+            return self._dispatch(path, method, host, False)
+
+        try:
+            segments = unquote_segments(path.split(PATH_DELIMITER))
+        except UnicodeDecodeError:
+            return NoMatch
+
+        if any(PATH_DELIMITER in segment for segment in segments):
+            return self._dispatch(path, method, host, True)
+
+        match = self._dispatch(PATH_DELIMITER.join(segments), method, host, False)
+        if match and match.should_redirect:
+            match.redirect_to = match.canonical_path = self._redirect_to(path)
+        return match
+
+    def _dispatch(
+        self, path: str, method: Optional[str], host: Optional[str], raw: bool
+    ) -> Match:
+        # `raw` paths have segments left to percent-decode.
+        if host is not None and self.hosts is not None:
+            resolved = self.hosts.resolve(host)
+            if resolved is not None:
+                router, host_kwargs = resolved
+                match = router._dispatch(path, method, None, raw)
+                if match and host_kwargs:
+                    match.kwargs = host_kwargs | match.kwargs
+                return match
+
+        route_stats = self.route_stats
+        if route_stats is None:
+            match = self._method_match(path, method, raw)
+            return NoMatch if type(match) is Miss else match
+
+        stats = route_stats.local()
+        if not route_stats.should_sample(stats):
+            match = self._method_match(path, method, raw)
+            elapsed = None
+        else:
+            start = perf_counter()
+            match = self._method_match(path, method, raw)
+            elapsed = perf_counter() - start
+
+        if match:
+            route_stats.hit(stats, match.node, match.should_redirect, elapsed)
+        elif type(match) is Miss:
+            route_stats.miss(stats, match.node)
+            return NoMatch
+        elif match is not NoMatch:
+            route_stats.not_allowed(stats, match.node, elapsed)
+
+        return match
+
+    def _method_match(
+        self, path: str, method: Optional[str], raw: bool = False
+    ) -> Match:
+        # Checked before paths are hashed or cached, see `_match`.
+        if self.max_path_length is not None and len(path) > self.max_path_length:
+            return self.misses.get(self.tree, NoMatch)
+
+        cache = self.cache
+        if raw:
+            # Paths with encoded slashes aren't cached with decoded paths.
+            match: Match = self._match(path, raw=True)
+        elif (precomputed := self.precomputed.get(path)) is not None:
+            match = precomputed.copy()
+        elif cache is None:
+            match = self._shared_match(path)
+        else:
+            cached = cache.get(path)
+            if cached is None:
+                cached = self._shared_match(path)
+                # Misses aren't kept, so that a scan of unknown paths can't evict
+                # the matches of the routes being served.
+                if cached and cached.node not in self.volatile_nodes:
+                    cache.set(path, cached)
+            match = cached.copy() if cached else cached
+
+        if not match:
+            return match
 
-    def _build_tree(self, routes: Sequence[RouteNode]) -> RouteNode:
-        if routes[0].converter.description != "":
-            return add_child_routes(route(""), routes)
-        return add_child_routes(routes[0], routes[1:])
+        # Only matched paths are sampled, see `dump_hot_paths`.
+        sampler = self.path_sampler
+        if sampler is not None and not raw:
+            sampler.countdown -= 1
+            if sampler.countdown <= 0:
+                sampler.record(path)
+
+        if method is None:
+            return match
+
+        node = match.node
+        if node.allowed_methods is None:
+            return match
+
+        # Methods are stored uppercased by `RouteNode.set_handler`.
+        handler = node.handler.get(method.upper())
+        if handler is None:
+            return self.not_allowed[node]
+
+        match.handler = handler
+        return match
+
+    def _shared_match(self, path: str) -> Match:
+        shared_cache = self.shared_cache
+        if shared_cache is None:
+            return self._match(path)
+
+        shared = shared_cache.get(path)
+        if shared is not None:
+            index, kwargs, _, converters = shared
+            # Entries of other route tables fail their checksum; those with
+            # indices out of range are ignored all the same.
+            if 0 <= index < len(self.nodes):
+                return self._restore(path, index, kwargs, converters)
+            if 0 <= -1 - index < len(self.tree_nodes):
+                # Misses are stored as the negated index of the deepest node reached.
+                return self.misses.get(self.tree_nodes[-1 - index], NoMatch)
+
+        match = self._match(path)
+        if match.node in self.volatile_nodes:
+            return match
+
+        if match:
+            kwargs = match.kwargs
+            converters: Optional[Dict[str, int]] = None
+            if type(kwargs) is LazyKwargs:
+                # Shared as captured, to be converted by the converters of the routes.
+                kwargs, converters = kwargs.values, {
+                    key: self.converter_indices[converter]
+                    for key, converter in kwargs.converters.items()
+                }
+            shared_cache.set(
+                path,
+                self.indices[match.node],
+                kwargs,
+                match.should_redirect,
+                converters,
+            )
+        else:
+            deepest = -1 - self.tree_indices[match.node] if match.node else -1
+            shared_cache.set(path, deepest, {}, False)
+
+        return match
+
+    def _restore(
+        self,
+        path: str,
+        index: int,
+        kwargs: Dict[str, Any],
+        converters: Optional[Mapping[str, int]] = None,
+    ) -> Match:
+        # Rebuilds the match of a path resolved by another process, without walking the tree.
+        if self.slash_policy == NORMALIZE:
+            path = normalize_path(path, self.append_slash)
+
+        if not converters:
+            return self._full_match(self.nodes[index], kwargs, path)
+
+        # Values shared unconverted by routers with `lazy_kwargs`.
+        by_key = {key: self.converters[i] for key, i in converters.items()}
+        if self.lazy_kwargs:
+            lazy = LazyKwargs(kwargs, by_key, self.native_uuids)
+            return self._full_match(self.nodes[index], lazy, path)
+
+        for key, converter in by_key.items():
+            kwargs[key] = converter.convert(kwargs[key], self.native_uuids)
+        return self._full_match(self.nodes[index], kwargs, path)
+
+    def _match(self, path: str, raw: bool = False) -> Match:
+        # Bound the work done for adversarial paths, failing before walking the tree.
+        if self.max_path_length is not None and len(path) > self.max_path_length:
+            return self.misses.get(self.tree, NoMatch)
+
+        if self.slash_policy == NORMALIZE:
+            path = normalize_path(path, self.append_slash)
 
-    def match(self, path: str) -> Match:
         node = self.tree
         kwargs: Dict[str, Any] = {}
+        # Components captured by path converters are joined once the walk is over.
+        path_kwargs: Optional[Dict[str, List[str]]] = None
+        # The converters of the values captured unconverted, see `AbstractConverter.converts`.
+        converters: Optional[Dict[str, AbstractConverter]] = None
         is_home_path = bool(path == "" or path == PATH_DELIMITER)
         components = [] if is_home_path else get_components(path)
+        if raw:
+            components = unquote_segments(components)
 
-        for component in components:
-            matched_node, partial_kwargs = node.match(component)
+        if self.max_segments is not None and len(components) > self.max_segments:
+            return self.misses.get(self.tree, NoMatch)
+
+        # Components already matched by a converter matching several at once.
+        skipped = 0
+        for index, component in enumerate(components):
+            if skipped:
+                skipped -= 1
+                continue
+
+            if node.spans is None:
+                matched_node, partial_kwargs = node.match(component)
+            else:
+                matched_node, partial_kwargs, segments = node.match_segments(
+                    components, index
+                )
+                skipped = segments - 1
             if matched_node is None:
-                return NoMatch
+                return self.misses.get(node, NoMatch)
 
             node = matched_node
             if partial_kwargs:
                 if node.converter_name != "path":
                     kwargs |= partial_kwargs
+                    if node.converter.converts:
+                        if converters is None:
+                            converters = {}
+                        for key in partial_kwargs:
+                            converters[key] = node.converter
+                    elif converters:
+                        for key in partial_kwargs:
+                            converters.pop(key, None)
                 else:
+                    if path_kwargs is None:
+                        path_kwargs = {}
                     for key, value in partial_kwargs.items():
-                        if key in kwargs:
-                            kwargs[key] += f"/{value}"
+                        if key in path_kwargs:
+                            path_kwargs[key].append(value)
                         else:
+                            path_kwargs[key] = [value]
                             kwargs[key] = value
 
         if node.handler is None:
-            return NoMatch
+            return self.misses.get(node, NoMatch)
+
+        if path_kwargs:
+            for key, values in path_kwargs.items():
+                kwargs[key] = PATH_DELIMITER.join(values)
+                if converters:
+                    converters.pop(key, None)
+
+        if converters:
+            if self.lazy_kwargs:
+                return self._full_match(
+                    node, LazyKwargs(kwargs, converters, self.native_uuids), path
+                )
+
+            for key, converter in converters.items():
+                kwargs[key] = converter.convert(kwargs[key], self.native_uuids)
+
+        return self._full_match(node, kwargs, path)
+
+    def _full_match(
+        self, node: RouteNode, kwargs: Mapping[str, Any], path: str
+    ) -> Match:
+        redirect_to = self._redirect_to(path)
+        if redirect_to is None:
+            return FullMatch(node, kwargs, False, None, path)
+
+        if self.slash_policy == STRICT:
+            return self.misses.get(node, NoMatch)
+
+        return FullMatch(node, kwargs, True, redirect_to, redirect_to)
+
+    def _redirect_to(self, path: str) -> Optional[str]:
+        if path == "" or path == PATH_DELIMITER:
+            return None
+
+        if self.append_slash and path[-1] != PATH_DELIMITER:
+            return path + PATH_DELIMITER
+        elif not self.append_slash and path[-1] == PATH_DELIMITER:
+            return path.rstrip(PATH_DELIMITER)
+
+        return None
+
+    def warm_up(self, paths: Iterable[str], limit: int = 1024) -> int:
+        """
+        Resolves the `limit` most frequent of `paths`, e.g. read from an access log
+        with `yrouter.hot_paths.parse_access_log`, and serves them from a table
+        shared by all threads. Returns the number of hot paths installed.
+        """
 
-        should_redirect = False
-        redirect_to = None
-        if not is_home_path:
-            if self.append_slash and path[-1] != PATH_DELIMITER:
-                redirect_to = path + PATH_DELIMITER
-                should_redirect = True
-            elif not self.append_slash and path[-1] == PATH_DELIMITER:
-                redirect_to = path.rstrip(PATH_DELIMITER)
-                should_redirect = True
+        self._ensure_built()
+        hot: Dict[str, FullMatch] = {}
+        for path, _ in Counter(paths).most_common(limit):
+            match = self._match(path)
+            if match and match.node not in self.volatile_nodes:
+                hot[path] = match
 
-        return FullMatch(node, kwargs, should_redirect, redirect_to)
+        self._install_hot_paths(hot)
+        return len(hot)
+
+    def _install_hot_paths(self, hot: Dict[str, FullMatch]) -> None:
+        # The lookup table is replaced at once, threads reading the previous one.
+        self.hot_paths = hot
+        self.precomputed = {**self.static_paths, **hot}
+
+    def dump_hot_paths(self, file: Union[str, os.PathLike], limit: int = 1024) -> int:
+        """
+        Writes the `limit` most frequent paths sampled from the traffic of the router,
+        followed by those installed by `warm_up` or `load_hot_paths`, with the routes
+        they resolve to, for `load_hot_paths` to restore them in another process.
+        Returns the number of hot paths written.
+        """
+
+        self._ensure_built()
+        paths: Dict[str, None] = {}
+        if self.path_sampler is not None:
+            paths.update(
+                (path, None) for path, _ in self.path_sampler.most_common(limit)
+            )
+        paths.update(dict.fromkeys(self.hot_paths))
+
+        entries = []
+        for path in paths:
+            if len(entries) >= limit:
+                break
+
+            match = self.hot_paths.get(path) or self._match(path)
+            if match and match.node not in self.volatile_nodes:
+                entries.append((path, self.indices[match.node], dict(match.kwargs)))
+
+        return hot_paths.dump(file, self.fingerprint(), entries)
+
+    def load_hot_paths(self, file: Union[str, os.PathLike]) -> int:
+        """
+        Restores hot paths written by `dump_hot_paths`, without matching them again.
+        Dumps of other routes are ignored, since their paths may resolve differently.
+        Returns the number of hot paths installed.
+        """
+
+        self._ensure_built()
+        entries = hot_paths.load(file, self.fingerprint())
+        if entries is None:
+            return 0
+
+        hot: Dict[str, FullMatch] = {}
+        for path, index, kwargs in entries:
+            if not 0 <= index < len(self.nodes):
+                continue
+
+            match = self._restore(path, index, kwargs)
+            if match and match.node not in self.volatile_nodes:
+                hot[path] = match
+
+        self._install_hot_paths(hot)
+        return len(hot)
+
+    def classify(self, paths: Iterable[str]) -> Classification:
+        """
+        Matches many paths, e.g. read from access logs, and returns the results
+        by column instead of a match per path. Repeated paths are only matched once.
+        Trailing line endings are stripped, so the lines of a file can be given as is.
+        """
+
+        self._ensure_built()
+        rows: Dict[str, int] = {}
+        results: List[Tuple[int, bool, Dict[str, Any]]] = []
+        codes = array(INDEX_TYPECODE)
+        for line in paths:
+            code = rows.get(line)
+            if code is None:
+                path = line.rstrip("\r\n")
+                code = rows.get(path)
+                if code is None:
+                    code = rows[path] = len(results)
+                    match = self.precomputed.get(path) or self._match(path)
+                    node = match.node
+                    if match:
+                        row = (self.indices[node], match.should_redirect, match.kwargs)
+                    else:
+                        row = (NO_ROUTE, False, {})
+                    results.append(row)
+                rows[line] = code
+            codes.append(code)
+
+        names = tuple(node.name for node in self.nodes)
+        return Classification.from_codes(codes, results, names)
 
     def find(self, handler_name: str, **kwargs) -> Optional[str]:
+        self._ensure_built()
         if handler_name not in HANDLER_NAMES:
             return None
 
@@ -70,5 +814,80 @@ class Router:
 
         return found
 
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns the counters kept by a router built with `stats=True`;
+        see `RouteStats.snapshot`. Those of the routers of hosts are keyed
+        by host under `hosts`.
+        """
+
+        self._ensure_built()
+        if self.route_stats is None:
+            raise RouterConfigurationError("Stats aren't enabled for this router.")
+
+        snapshot = self.route_stats.snapshot()
+        if self.hosts is not None:
+            snapshot["hosts"] = {
+                host: router.route_stats.snapshot()
+                for host, router in host_routers(self.hosts).items()
+                if router.route_stats is not None
+            }
+        return snapshot
+
+    def prometheus_metrics(self, prefix: str = "yrouter") -> str:
+        """
+        Returns the counters of `Router.stats` in the Prometheus text format,
+        those of the routers of hosts labelled by host.
+        """
+
+        snapshot = self.stats()
+        return prometheus({None: snapshot, **snapshot.get("hosts", {})}, prefix)
+
+    def converter_cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns the size, hits, misses and hit rate of the caches of the converters
+        declared with a `cache_size` used by the routes, by converter name.
+        """
+
+        self._ensure_built()
+        return {
+            node.converter_name: node.converter.cache.stats()
+            for node in self.tree_nodes
+            if node.converter.cache is not None
+        }
+
+    def url_builder(self, handler_name: str) -> URLBuilder:
+        """
+        Returns a callable building the path of the routes named `handler_name`
+        from keyword arguments, equivalent to `Router.find` but without walking the tree.
+        """
+
+        self._ensure_built()
+        builder = self.builders.get(handler_name)
+        if builder is None:
+            builder = self.builders[handler_name] = URLBuilder(
+                self.tree, handler_name, self.append_slash, self.find
+            )
+
+        return builder
+
+    def find_many(
+        self, handler_name: str, kwargs_iterable: Iterable[Mapping[str, Any]]
+    ) -> Iterator[Optional[str]]:
+        """Lazily finds the path of the route named `handler_name` for each mapping."""
+
+        build = self.url_builder(handler_name).build
+        return map(build, kwargs_iterable)
+
     def display(self):
+        self._ensure_built()
         self.tree.display(0)
+
+
+def host_routers(hosts: HostDispatcher[Router]) -> Dict[str, Router]:
+    """Returns the routers of `hosts`, keyed by the hosts sharing them."""
+
+    shared: Dict[Router, List[str]] = {}
+    for host, router in hosts.targets.items():
+        shared.setdefault(router, []).append(host)
+    return {", ".join(names): router for router, names in shared.items()}
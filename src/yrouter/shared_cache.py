@@ -0,0 +1,141 @@
+import mmap
+import os
+import struct
+import zlib
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+MAGIC = b"YRSC"
+FORMAT_VERSION = 2
+HEADER = struct.Struct("<4sHII32s")
+HEADER_SIZE = 64
+SLOT_HEADER = struct.Struct("<IHH")
+ENTRY_HEADER = struct.Struct("<i?")
+FIELD_DELIMITER = "\x1f"
+CONVERTER_DELIMITER = ":"
+
+SharedEntry = Tuple[int, Dict[str, Any], bool, Dict[str, int]]
+
+
+class SharedMatchCache:
+    """
+    A match cache stored in a memory-mapped file, shared by every process
+    that opens the same file, e.g. the workers of a pre-fork server.
+
+    The file holds a fixed-size hash table of `slots` entries of `slot_size` bytes
+    mapping a path to the index of the matched route, its keyword arguments,
+    whether it should be redirected and the keyword arguments left to convert,
+    see `LazyKwargs`, mapped to the index of their converter. Reads and writes
+    take no locks: each slot is read in a single copy and validated against its
+    checksum, so a slot being written concurrently is read as a miss.
+    Colliding paths overwrite each other.
+
+    Only keyword arguments made of strings and integers are shared; each is stored
+    as a type-tagged field so that reading an entry never evaluates its content.
+    Paths and results that don't fit in a slot are skipped.
+    Every process sharing a file must open it with the same `slots` and `slot_size`.
+    """
+
+    def __init__(self, path: str, slots: int = 65536, slot_size: int = 256) -> None:
+        self.path = path
+        self.slots = slots
+        self.slot_size = slot_size
+        self.size = HEADER_SIZE + slots * slot_size
+
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self._fd).st_size != self.size:
+            os.ftruncate(self._fd, self.size)
+        self._mm = mmap.mmap(self._fd, self.size)
+        # The checksums of slots are seeded with the fingerprint of the route table
+        # that wrote them, see `bind`.
+        self._seed = 0
+
+    def bind(self, fingerprint: bytes) -> None:
+        """
+        Attaches the cache to a route table identified by `fingerprint`.
+        Entries written for another route table are discarded, and entries written
+        afterwards by processes still running another route table, e.g. during
+        a rolling reload, are read as misses.
+        """
+
+        self._seed = zlib.crc32(fingerprint)
+
+        expected = HEADER.pack(
+            MAGIC, FORMAT_VERSION, self.slots, self.slot_size, fingerprint
+        )
+        if self._mm[: HEADER.size] != expected:
+            self._mm[HEADER_SIZE:] = bytes(self.size - HEADER_SIZE)
+            self._mm[: HEADER.size] = expected
+
+    def _offset(self, key: bytes) -> int:
+        return HEADER_SIZE + (zlib.crc32(key) % self.slots) * self.slot_size
+
+    def get(self, path: str) -> Optional[SharedEntry]:
+        key = path.encode()
+        offset = self._offset(key)
+        slot = self._mm[offset : offset + self.slot_size]
+
+        checksum, key_length, value_length = SLOT_HEADER.unpack_from(slot)
+        if key_length != len(key) or not value_length:
+            return None
+
+        data = slot[SLOT_HEADER.size : SLOT_HEADER.size + key_length + value_length]
+        if zlib.crc32(data, self._seed) != checksum or data[:key_length] != key:
+            return None
+
+        index, should_redirect = ENTRY_HEADER.unpack_from(data, key_length)
+        kwargs: Dict[str, Any] = {}
+        converters: Dict[str, int] = {}
+        encoded = data[key_length + ENTRY_HEADER.size :].decode()
+        if encoded:
+            fields = iter(encoded.split(FIELD_DELIMITER))
+            for field, value in zip(fields, fields):
+                tag, name = field[0], field[1:]
+                if tag == "i":
+                    kwargs[name] = int(value)
+                elif tag == "c":
+                    converter, _, kwargs[name] = value.partition(CONVERTER_DELIMITER)
+                    converters[name] = int(converter)
+                else:
+                    kwargs[name] = value
+
+        return (index, kwargs, should_redirect, converters)
+
+    def set(
+        self,
+        path: str,
+        index: int,
+        kwargs: Mapping[str, Any],
+        should_redirect: bool,
+        converters: Optional[Mapping[str, int]] = None,
+    ) -> None:
+        fields = []
+        for field, value in kwargs.items():
+            if type(value) not in (str, int) or FIELD_DELIMITER in f"{field}{value}":
+                return
+            if converters and field in converters:
+                if type(value) is not str:
+                    return
+                fields.append(f"c{field}")
+                fields.append(f"{converters[field]}{CONVERTER_DELIMITER}{value}")
+            else:
+                fields.append(f"{'i' if type(value) is int else 's'}{field}")
+                fields.append(str(value))
+
+        key = path.encode()
+        entry = ENTRY_HEADER.pack(index, should_redirect)
+        value = entry + FIELD_DELIMITER.join(fields).encode()
+        data = key + value
+        if SLOT_HEADER.size + len(data) > self.slot_size:
+            return
+
+        offset = self._offset(key)
+        checksum = zlib.crc32(data, self._seed)
+        slot = SLOT_HEADER.pack(checksum, len(key), len(value)) + data
+        self._mm[offset : offset + len(slot)] = slot
+
+    def clear(self) -> None:
+        self._mm[HEADER_SIZE:] = bytes(self.size - HEADER_SIZE)
+
+    def close(self) -> None:
+        self._mm.close()
+        os.close(self._fd)
@@ -0,0 +1,279 @@
+import threading
+from bisect import bisect_left
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from .constants import PATH_DELIMITER
+from .route_node import RouteNode
+
+# Upper bounds, in seconds, of the latency histogram buckets.
+DEFAULT_BUCKETS = (
+    0.000005,
+    0.00001,
+    0.000025,
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.005,
+    0.01,
+)
+
+COUNTERS = ("hits", "redirects", "not_allowed", "misses", "latencies", "latency_sums")
+
+
+class ThreadStats:
+    """The counters of a single thread, preallocated and indexed by route."""
+
+    __slots__ = (
+        "hits",
+        "redirects",
+        "not_allowed",
+        "misses",
+        "latencies",
+        "latency_sums",
+        "countdown",
+    )
+
+    def __init__(self, routes: int, nodes: int, buckets: int) -> None:
+        self.hits = [0] * routes
+        self.redirects = [0] * routes
+        self.not_allowed = [0] * routes
+        self.misses = [0] * nodes
+        # One row of `buckets + 1` counts per route, the last one counting +Inf.
+        self.latencies = [0] * (routes * (buckets + 1))
+        self.latency_sums = [0.0] * routes
+        self.countdown = 1
+
+    def add(self, other: "ThreadStats") -> None:
+        """Adds the counters of `other` to this one's."""
+
+        for counters in COUNTERS:
+            totals = getattr(self, counters)
+            for index, value in enumerate(getattr(other, counters)):
+                totals[index] += value
+
+
+class RouteStats:
+    """
+    Aggregates per route hits, redirects and `MethodNotAllowed` results,
+    misses by deepest node reached and a latency histogram of sampled matches.
+
+    Each thread increments its own preallocated counters, which are only summed
+    when exported, so recording takes no lock and allocates nothing. The counters
+    of threads which have exited are added to a shared total and dropped.
+    One in `1 / sample_rate` matches of each thread is timed.
+    """
+
+    def __init__(
+        self,
+        routes: Sequence[RouteNode],
+        nodes: Sequence[RouteNode],
+        paths: Mapping[RouteNode, str],
+        sample_rate: float = 0.01,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.routes = routes
+        self.nodes = nodes
+        self.paths = paths
+        self.route_indices = {node: index for index, node in enumerate(routes)}
+        self.node_indices = {node: index for index, node in enumerate(nodes)}
+        self.sample_interval = max(1, round(1 / sample_rate)) if sample_rate else 0
+        self.buckets = tuple(buckets)
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._threads: List[Tuple[threading.Thread, ThreadStats]] = []
+        self._retired = ThreadStats(len(routes), len(nodes), len(self.buckets))
+
+    def local(self) -> ThreadStats:
+        """Returns the counters of the calling thread."""
+
+        try:
+            return self._local.stats
+        except AttributeError:
+            stats = self._local.stats = ThreadStats(
+                len(self.routes), len(self.nodes), len(self.buckets)
+            )
+            # Only registering a new thread takes the lock.
+            with self._lock:
+                self._retire_threads()
+                self._threads.append((threading.current_thread(), stats))
+            return stats
+
+    def _retire_threads(self) -> None:
+        # Exited threads can't increment their counters anymore.
+        threads = []
+        for thread, stats in self._threads:
+            if thread.is_alive():
+                threads.append((thread, stats))
+            else:
+                self._retired.add(stats)
+        self._threads = threads
+
+    def should_sample(self, stats: ThreadStats) -> bool:
+        if not self.sample_interval:
+            return False
+
+        stats.countdown -= 1
+        if stats.countdown:
+            return False
+
+        stats.countdown = self.sample_interval
+        return True
+
+    def hit(
+        self,
+        stats: ThreadStats,
+        node: RouteNode,
+        should_redirect: bool,
+        elapsed: Optional[float],
+    ) -> None:
+        index = self.route_indices[node]
+        stats.hits[index] += 1
+        if should_redirect:
+            stats.redirects[index] += 1
+        if elapsed is not None:
+            self._observe(stats, index, elapsed)
+
+    def not_allowed(
+        self, stats: ThreadStats, node: RouteNode, elapsed: Optional[float]
+    ) -> None:
+        index = self.route_indices[node]
+        stats.not_allowed[index] += 1
+        if elapsed is not None:
+            self._observe(stats, index, elapsed)
+
+    def miss(self, stats: ThreadStats, node: RouteNode) -> None:
+        stats.misses[self.node_indices[node]] += 1
+
+    def _observe(self, stats: ThreadStats, index: int, elapsed: float) -> None:
+        row = index * (len(self.buckets) + 1)
+        stats.latencies[row + bisect_left(self.buckets, elapsed)] += 1
+        stats.latency_sums[index] += elapsed
+
+    def _totals(self, counters: str) -> list:
+        with self._lock:
+            self._retire_threads()
+            threads = [self._retired, *(stats for _, stats in self._threads)]
+
+        return [sum(values) for values in zip(*(getattr(t, counters) for t in threads))]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Returns the aggregated counters of all threads: per route path, its hits,
+        redirects, `MethodNotAllowed` results and latency histogram, whose
+        cumulative bucket counts are keyed by upper bound; and the number of
+        misses per deepest node reached, omitting nodes without misses.
+        """
+
+        hits, redirects, not_allowed, misses, latencies, latency_sums = (
+            self._totals(counters) for counters in COUNTERS
+        )
+        width = len(self.buckets) + 1
+
+        routes = {}
+        for index, node in enumerate(self.routes):
+            counts = latencies[index * width : (index + 1) * width]
+            cumulative, buckets = 0, {}
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                buckets[bound] = cumulative
+
+            routes[self.paths[node]] = {
+                "name": node.name,
+                "hits": hits[index],
+                "redirects": redirects[index],
+                "not_allowed": not_allowed[index],
+                "latency": {
+                    "count": cumulative,
+                    "sum": latency_sums[index],
+                    "buckets": buckets,
+                },
+            }
+
+        return {
+            "routes": routes,
+            "misses": {
+                self.paths[node]: count
+                for node, count in zip(self.nodes, misses)
+                if count
+            },
+        }
+
+    def prometheus(self, prefix: str = "yrouter") -> str:
+        """Returns the aggregated counters in the Prometheus text exposition format."""
+
+        return prometheus({None: self.snapshot()}, prefix)
+
+
+def prometheus(snapshots: Mapping[Optional[str], Dict[str, Any]], prefix: str) -> str:
+    """
+    Returns snapshots of `RouteStats` in the Prometheus text exposition format,
+    labelled by the hosts they're keyed by, if any.
+    """
+
+    lines = []
+    for metric, kind, description in (
+        ("hits", "counter", "Matches per route."),
+        ("redirects", "counter", "Matches per route that should be redirected."),
+        ("not_allowed", "counter", "Matches per route with a method not allowed."),
+    ):
+        lines.append(f"# HELP {prefix}_{metric}_total {description}")
+        lines.append(f"# TYPE {prefix}_{metric}_total {kind}")
+        for host, snapshot in snapshots.items():
+            for path, route in snapshot["routes"].items():
+                labels = route_labels(path, route["name"], host)
+                lines.append(f"{prefix}_{metric}_total{{{labels}}} {route[metric]}")
+
+    lines.append(
+        f"# HELP {prefix}_misses_total Paths not matched, by deepest node reached."
+    )
+    lines.append(f"# TYPE {prefix}_misses_total counter")
+    for host, snapshot in snapshots.items():
+        for path, count in snapshot["misses"].items():
+            labels = host_label(host) + f'node="{escape(path)}"'
+            lines.append(f"{prefix}_misses_total{{{labels}}} {count}")
+
+    lines.append(f"# HELP {prefix}_match_seconds Sampled latency of matches per route.")
+    lines.append(f"# TYPE {prefix}_match_seconds histogram")
+    for host, snapshot in snapshots.items():
+        for path, route in snapshot["routes"].items():
+            labels = route_labels(path, route["name"], host)
+            latency = route["latency"]
+            for bound, count in latency["buckets"].items():
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(
+                    f'{prefix}_match_seconds_bucket{{{labels},le="{le}"}} {count}'
+                )
+            lines.append(f"{prefix}_match_seconds_sum{{{labels}}} {latency['sum']}")
+            lines.append(f"{prefix}_match_seconds_count{{{labels}}} {latency['count']}")
+
+    return "\n".join(lines) + "\n"
+
+
+def route_labels(path: str, name: Optional[str], host: Optional[str] = None) -> str:
+    return host_label(host) + f'route="{escape(path)}",name="{escape(name or "")}"'
+
+
+def host_label(host: Optional[str]) -> str:
+    return "" if host is None else f'host="{escape(host)}",'
+
+
+def escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def node_paths(tree: RouteNode) -> Dict[RouteNode, str]:
+    """Returns the path leading to each node of `tree`, the first one found for shared nodes."""
+
+    paths = {tree: PATH_DELIMITER}
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        for child in node.children:
+            if child not in paths:
+                paths[child] = paths[node] + child.component + PATH_DELIMITER
+                stack.append(child)
+
+    return paths
@@ -0,0 +1,140 @@
+from typing import (
+    Any,
+    Callable,
+    FrozenSet,
+    Iterator,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from .constants import END_DESCRIPTION, PATH_DELIMITER, START_DESCRIPTION
+from .route_node import RouteNode
+
+Part = Tuple[str, Callable[[str], Optional[str]], str]
+
+
+class Template:
+    """
+    The path leading to a named node, with its static parts pre-joined:
+    `head` is followed, for each dynamic part, by the component built
+    from a keyword argument and the static text that follows it.
+    """
+
+    __slots__ = ("head", "parts", "identifiers")
+
+    def __init__(self, chain: Sequence[RouteNode], append_slash: bool) -> None:
+        texts = [""]
+        converters = []
+        for node in chain:
+            if is_dynamic(node):
+                converters.append((node.converter.identifier, node.converter.to_url))
+                texts.append(PATH_DELIMITER)
+            else:
+                texts[-1] += node.component + PATH_DELIMITER
+
+        if not append_slash:
+            texts[-1] = texts[-1][:-1]
+
+        self.head = texts[0]
+        self.parts: Tuple[Part, ...] = tuple(
+            (identifier, to_url, text)
+            for (identifier, to_url), text in zip(converters, texts[1:])
+        )
+        self.identifiers: FrozenSet[str] = frozenset(
+            identifier for identifier, _ in converters
+        )
+
+    def build(self, kwargs: Mapping[str, Any]) -> Optional[str]:
+        url = self.head
+        for identifier, to_url, static in self.parts:
+            component = to_url(str(kwargs[identifier]))
+            if component is None:
+                return None
+            url += component + static
+
+        return url
+
+
+def is_dynamic(node: RouteNode) -> bool:
+    component = node.component
+    return component.startswith(START_DESCRIPTION) and component.endswith(
+        END_DESCRIPTION
+    )
+
+
+class URLBuilder:
+    """
+    Builds the paths of the routes named `handler_name`, given keyword arguments.
+
+    Templates are precomputed for every named route, in the order `Router.find`
+    visits them, so that building a path doesn't walk the tree.
+    The first template whose identifiers are exactly the keyword arguments
+    and whose converters accept them is used. Like `Router.find`, a builder
+    returns `None` if no route fits the keyword arguments.
+
+    Routes going through a regex converter can't be templated since the
+    identifiers they consume depend on the values; builders for them fall back
+    to `fallback`, i.e. walking the tree.
+    """
+
+    __slots__ = ("handler_name", "templates", "fallback")
+
+    def __init__(
+        self,
+        tree: RouteNode,
+        handler_name: str,
+        append_slash: bool,
+        fallback: Callable[..., Optional[str]],
+    ) -> None:
+        self.handler_name = handler_name
+        self.fallback: Optional[Callable[..., Optional[str]]] = None
+
+        chains = list(named_chains(tree, handler_name))
+        if any(node.converter_name == "re" for chain in chains for node in chain):
+            self.fallback = fallback
+
+        # Templates needing an identifier twice, or none, can't be satisfied.
+        templates = (Template(chain, append_slash) for chain in chains)
+        self.templates: Tuple[Template, ...] = tuple(
+            template
+            for template in templates
+            if len(template.identifiers - {None}) == len(template.parts)
+        )
+
+    def __call__(self, **kwargs) -> Optional[str]:
+        return self.build(kwargs)
+
+    def build(self, kwargs: Mapping[str, Any]) -> Optional[str]:
+        if self.fallback is not None:
+            return self.fallback(self.handler_name, **kwargs)
+
+        for template in self.templates:
+            if template.identifiers == kwargs.keys():
+                url = template.build(kwargs)
+                if url is not None:
+                    return url
+
+        return None
+
+    def __repr__(self):
+        return f"<URLBuilder: handler_name={self.handler_name}>"
+
+
+def named_chains(tree: RouteNode, handler_name: str) -> Iterator[Tuple[RouteNode, ...]]:
+    """
+    Yields the chains of nodes leading from `tree` to each node with a handler
+    named `handler_name`, in preorder. A node appears at most once in a chain.
+    """
+
+    stack = [(tree,)]
+    while stack:
+        chain = stack.pop()
+        node = chain[-1]
+        if node.handler and node.name == handler_name:
+            yield chain
+
+        stack.extend(
+            chain + (child,) for child in reversed(node.children) if child not in chain
+        )
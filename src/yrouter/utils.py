@@ -1,9 +1,20 @@
-from typing import List, Sequence
+from typing import (
+    AbstractSet,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+)
+from urllib.parse import quote, unquote
 
 from .constants import (
     DESCRIPTION_DELIMITER,
     END_DESCRIPTION,
     PATH_DELIMITER,
+    PATH_SAFE,
+    PERCENT,
     START_DESCRIPTION,
 )
 from .converters import AbstractConverter, ExactConverter, get_converters
@@ -15,6 +26,10 @@ def add_child_routes(root: RouteNode, children: Sequence[RouteNode]) -> RouteNod
     described = set()
 
     for route in children:
+        # Routes declared with `lazy_route` are parsed once added to a tree.
+        if not isinstance(route, RouteNode):
+            route = route.materialize()
+
         if (description := route.converter.description) in described:
             raise RouterConfigurationError(
                 f"A node matching '{description}' already exists at this level of the tree."
@@ -26,10 +41,173 @@ def add_child_routes(root: RouteNode, children: Sequence[RouteNode]) -> RouteNod
     return root
 
 
+def overlay_routes(
+    tree: RouteNode, extra: Optional[RouteNode], removed_names: AbstractSet[str]
+) -> RouteNode:
+    """
+    Returns a copy of `tree` where the routes of `extra` are merged, overriding the
+    handlers of existing routes, and the routes named in `removed_names` are removed.
+    Only the nodes on the way to a modified node are copied, other subtrees are
+    shared with `tree`.
+    """
+
+    touched: Set[RouteNode] = set()
+    visited: Set[RouteNode] = set()
+    found: Set[str] = set()
+
+    def find_removed(node: RouteNode) -> bool:
+        # Nodes of `path` converters are their own children.
+        if node in visited:
+            return node in touched
+
+        visited.add(node)
+        below = False
+        for child in node.children:
+            below = find_removed(child) or below
+        if node.name in removed_names and node.handler is not None:
+            found.add(node.name)
+            below = True
+        if below:
+            touched.add(node)
+        return below
+
+    if removed_names:
+        find_removed(tree)
+        if missing := set(removed_names) - found:
+            raise RouterConfigurationError(
+                f"No route named '{sorted(missing)[0]}' to remove."
+            )
+
+    copies: Dict[RouteNode, RouteNode] = {}
+
+    def overlay(node: RouteNode, extra: Optional[RouteNode]) -> Optional[RouteNode]:
+        if node in copies:
+            return copies[node]
+        if extra is None and node not in touched:
+            return node
+
+        handler, name = node.handler, node.name
+        if extra is not None and extra.handler is not None:
+            handler, name = extra.handler, extra.name
+        if name in removed_names:
+            handler, name = None, None
+
+        extras = {}
+        for route in extra.children if extra is not None else ():
+            if (description := route.converter.description) in extras:
+                raise RouterConfigurationError(
+                    f"A node matching '{description}' already exists at this level of the tree."
+                )
+            extras[description] = route
+
+        copy = copies[node] = RouteNode(node.converter, handler, name)
+        for child in node.children:
+            overlaid = overlay(child, extras.pop(child.component, None))
+            if overlaid is not None:
+                copy.children.append(overlaid)
+        copy.children.extend(extras.values())
+
+        # Removed routes don't leave empty branches behind.
+        if handler is None and not copy.children and node is not tree:
+            return None
+
+        return copy
+
+    overlaid = overlay(tree, extra)
+    assert overlaid is not None
+    return overlaid
+
+
+def static_paths(tree: RouteNode) -> Iterator[str]:
+    """
+    Yields the paths, ending with a slash, of the routes of `tree` having
+    only exact components.
+    """
+
+    stack = [(tree, PATH_DELIMITER)]
+    while stack:
+        node, path = stack.pop()
+        if node.handler is not None:
+            yield path
+
+        for child in node.children:
+            if type(child.converter) is ExactConverter and child.component:
+                stack.append((child, path + child.component + PATH_DELIMITER))
+
+
 def get_components(path: str) -> List[str]:
     return path.strip(PATH_DELIMITER).split(PATH_DELIMITER)
 
 
+def normalize_path(path: str, append_slash: bool = True) -> str:
+    """
+    Returns the canonical form of `path` in a single pass over its components:
+    empty and `.` components are dropped and `..` removes the previous component.
+    The result starts with a slash and ends with one if `append_slash` is set.
+
+    >>> normalize_path("users//66/./posts/../")
+    '/users/66/'
+    >>> normalize_path("users/66", append_slash=False)
+    '/users/66'
+    >>> normalize_path("/../")
+    '/'
+    """
+
+    if "//" not in path and "/." not in path and not path.startswith("."):
+        stripped = path.strip(PATH_DELIMITER)
+        if not stripped:
+            return PATH_DELIMITER
+
+        normalized = PATH_DELIMITER + stripped
+        return normalized + PATH_DELIMITER if append_slash else normalized
+
+    components: List[str] = []
+    for component in path.split(PATH_DELIMITER):
+        if component == "..":
+            if components:
+                components.pop()
+        elif component and component != ".":
+            components.append(component)
+
+    if not components:
+        return PATH_DELIMITER
+
+    normalized = PATH_DELIMITER + PATH_DELIMITER.join(components)
+    return normalized + PATH_DELIMITER if append_slash else normalized
+
+
+def unquote_segments(segments: Sequence[str]) -> List[str]:
+    """
+    Percent-decodes the segments of a raw path, as UTF-8.
+    Segments without escapes are kept as is.
+
+    >>> unquote_segments(["users", "J%C3%B6rg", "a%2Fb"])
+    ['users', 'Jörg', 'a/b']
+    """
+
+    return [
+        unquote(segment, errors="strict") if PERCENT in segment else segment
+        for segment in segments
+    ]
+
+
+def redirect_location(redirect_to: str, raw: bool) -> str:
+    """
+    Percent-encodes the path a request is redirected to. Paths redirected from
+    a raw path, see `Router.match`, keep their escapes.
+
+    >>> redirect_location("/users/Jörg%/", raw=False)
+    '/users/J%C3%B6rg%25/'
+    >>> redirect_location("/users/J%C3%B6rg/", raw=True)
+    '/users/J%C3%B6rg/'
+    """
+
+    if redirect_to.isascii() and (raw or PERCENT not in redirect_to):
+        return redirect_to
+
+    return quote(redirect_to, PATH_SAFE + PERCENT if raw else PATH_SAFE)
+
+
 def get_converter(description: str) -> AbstractConverter:
     if description.startswith(START_DESCRIPTION) and description.endswith(
         END_DESCRIPTION
@@ -0,0 +1,120 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import unquote_to_bytes
+
+from .constants import PERCENT
+from .match import MethodNotAllowed
+from .router import Router
+from .utils import redirect_location
+
+Environ = Dict[str, Any]
+StartResponse = Callable[..., Any]
+Headers = List[Tuple[str, str]]
+
+NOT_FOUND_STATUS = "404 Not Found"
+NOT_FOUND_BODY = (b"Not Found",)
+NOT_FOUND_HEADERS: Headers = [
+    ("Content-Type", "text/plain; charset=utf-8"),
+    ("Content-Length", str(len(NOT_FOUND_BODY[0]))),
+]
+METHOD_NOT_ALLOWED_STATUS = "405 Method Not Allowed"
+METHOD_NOT_ALLOWED_BODY = (b"Method Not Allowed",)
+REDIRECT_STATUS = "301 Moved Permanently"
+EMPTY_BODY: Tuple[bytes, ...] = ()
+
+
+class WSGIDispatcher:
+    """
+    A WSGI application dispatching requests to the handlers of `router`, called
+    as `handler(environ, start_response, **kwargs)`.
+    Paths that should be redirected get a permanent redirection, paths that
+    aren't matched a 404 response and methods that aren't handled a 405 response,
+    prepared once.
+    """
+
+    def __init__(self, router: Router) -> None:
+        self.router = router
+        self.not_allowed: Dict[MethodNotAllowed, Headers] = {}
+
+    def __call__(
+        self, environ: Environ, start_response: StartResponse
+    ) -> Iterable[bytes]:
+        path = raw_path(environ)
+        if path is None:
+            # WSGI strings hold the bytes sent by the client decoded as latin-1.
+            try:
+                path = environ.get("PATH_INFO", "").encode("latin-1").decode()
+            except UnicodeError:
+                path = None
+
+        match = None
+        if path is not None:
+            match = self.router.match(
+                path, environ["REQUEST_METHOD"], self.host(environ)
+            )
+
+        if match:
+            if not match.should_redirect:
+                return match.handler(environ, start_response, **match.kwargs)
+
+            location = redirect_location(match.redirect_to, type(path) is bytes)
+            if environ.get("QUERY_STRING"):
+                location += "?" + environ["QUERY_STRING"]
+            start_response(
+                REDIRECT_STATUS, [("Location", location), ("Content-Length", "0")]
+            )
+            return EMPTY_BODY
+
+        # Servers may add headers to the lists they're given.
+        if type(match) is MethodNotAllowed:
+            start_response(
+                METHOD_NOT_ALLOWED_STATUS, list(self.method_not_allowed_headers(match))
+            )
+            return METHOD_NOT_ALLOWED_BODY
+
+        start_response(NOT_FOUND_STATUS, list(NOT_FOUND_HEADERS))
+        return NOT_FOUND_BODY
+
+    def host(self, environ: Environ) -> Optional[str]:
+        router = self.router
+        # Lazy routers are built before their hosts are read.
+        if not router.frozen:
+            router.freeze()
+
+        if router.hosts is None:
+            return None
+
+        return environ.get("HTTP_HOST")
+
+    def method_not_allowed_headers(self, match: MethodNotAllowed) -> Headers:
+        headers = self.not_allowed.get(match)
+        if headers is None:
+            headers = self.not_allowed[match] = [
+                ("Allow", ", ".join(sorted(match.allowed_methods))),
+                ("Content-Type", "text/plain; charset=utf-8"),
+                ("Content-Length", str(len(METHOD_NOT_ALLOWED_BODY[0]))),
+            ]
+
+        return headers
+
+
+def raw_path(environ: Environ) -> Optional[bytes]:
+    """
+    Returns the raw path of the request, as the ASGI dispatcher matches it,
+    if the server gives it and it has escapes, which `PATH_INFO` has decoded.
+    """
+
+    raw = environ.get("RAW_URI") or environ.get("REQUEST_URI")
+    if not raw or PERCENT not in raw or environ.get("SCRIPT_NAME"):
+        return None
+
+    try:
+        path = raw.partition("?")[0].encode("latin-1")
+        path_info = environ.get("PATH_INFO", "").encode("latin-1")
+    except UnicodeError:
+        return None
+
+    # Ignored unless it's the path the server decoded, e.g. for absolute URIs.
+    if unquote_to_bytes(path) != path_info:
+        return None
+
+    return path
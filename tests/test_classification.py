@@ -0,0 +1,60 @@
+from yrouter import Router
+
+from .routes import routes
+
+
+def test_classify():
+    router = Router(routes)
+    paths = ["/int/5/", "/unknown-1/", "/int/5/", "/articles/2015/04/12", "/items/x/"]
+    classification = router.classify(iter(paths))
+
+    assert len(classification) == 5
+    assert list(classification.indices) == [
+        router.indices[router.match("/int/5/").node],
+        -1,
+        router.indices[router.match("/int/5/").node],
+        router.indices[router.match("/articles/2015/04/12").node],
+        -1,
+    ]
+    assert classification.indices.itemsize == 4
+    assert list(classification.redirects) == [0, 0, 0, 1, 0]
+    assert classification.kwargs == {
+        "id": [5, None, 5, None, None],
+        "year": [None, None, None, 2015, None],
+        "month": [None, None, None, 4, None],
+        "day": [None, None, None, 12, None],
+    }
+    assert [classification.names[index] for index in classification.indices[:1]] == [
+        "int"
+    ]
+    assert len(classification.names) == len(router.nodes)
+
+
+def test_classify_matches_distinct_paths_once():
+    router = Router(routes)
+    matched = []
+    match = router._match
+    router._match = lambda path: matched.append(path) or match(path)
+
+    classification = router.classify(["/int/5/", "/int/6/"] * 100)
+    assert matched == ["/int/5/", "/int/6/"]
+    assert classification.kwargs["id"] == [5, 6] * 100
+
+
+def test_classify_nothing():
+    classification = Router(routes).classify([])
+    assert len(classification) == 0
+    assert classification.kwargs == {}
+
+
+def test_classify_file_lines(tmp_path):
+    log = tmp_path / "paths.log"
+    log.write_bytes(b"/int/5/\n/int/5/\r\n/unknown/\n/int/6/")
+    router = Router(routes)
+
+    with open(log, newline="") as lines:
+        classification = router.classify(lines)
+
+    int_index = router.indices[router.match("/int/5/").node]
+    assert list(classification.indices) == [int_index, int_index, -1, int_index]
+    assert classification.kwargs == {"id": [5, 5, None, 6]}
@@ -1,6 +1,12 @@
+import threading
+
 import pytest
 
-from yrouter import Router, RouterConfigurationError, route
+from yrouter import NoMatch, Router, RouterConfigurationError, lazy_route, route
+from yrouter.route import LazyRoute
+
+from . import handlers
+from .routes import routes
 
 
 def test_match_home_undifferently(router):
@@ -38,3 +44,166 @@ def test_already_registered_path():
     expected = "A node matching 'home' already exists at this level of the tree."
     with pytest.raises(RouterConfigurationError, match=expected):
         Router([route(""), route("home/"), route("home/about")])
+
+
+def test_routes_shared_between_routers():
+    routes = (route("", name="home"), route("home/", lambda: None, name="home"))
+    first, second = Router(routes), Router(routes)
+
+    assert first.tree is not second.tree
+    assert routes[0].children == []
+    assert len(second.tree.children) == 1
+    assert isinstance(second.tree.children, tuple)
+
+
+def test_match_cache_is_local_to_threads(router):
+    match = router.match("/int/5/")
+    match.kwargs["id"] = 6
+    assert router.match("/int/5/").kwargs == {"id": 5}
+    assert router.match("/int/5/") is not router.match("/int/5/")
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(router.match("/int/5/")))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [match.kwargs for match in results] == [{"id": 5}] * 4
+    assert router.cache.get("/int/5/") is not None
+
+    uncached = Router(routes, cache_size=0)
+    assert uncached.cache is None
+    assert uncached.match("/int/5/").kwargs == {"id": 5}
+
+
+def test_match_cache_keeps_recently_used():
+    router = Router(routes, cache_size=2)
+    router.match("/int/1/")
+    router.match("/int/2/")
+    router.match("/int/1/")
+    router.match("/int/3/")
+
+    assert router.cache.get("/int/1/") is not None
+    assert router.cache.get("/int/2/") is None
+
+    for index in range(10):
+        assert router.match(f"/unknown-{index}/") is NoMatch
+
+    assert router.cache.get("/int/1/") is not None
+    assert router.cache.get("/int/3/") is not None
+    assert router.cache.get("/unknown-0/") is None
+
+
+def test_vetted_regexes():
+    safe = route(r"<re:page-(?P<page>\d+)$>", lambda: None, name="page")
+    Router((route(""), safe), vetted_regexes=True)
+
+    unsafe = route(r"<re:(?P<word>(a+)+)$>", lambda: None, name="word")
+    assert Router((route(""), unsafe)).match("aaa/")
+
+    expected = "The regex of '<re:\\(\\?P<word>\\(a\\+\\)\\+\\)\\$>' may backtrack"
+    with pytest.raises(RouterConfigurationError, match=expected):
+        Router((route(""), safe, unsafe), vetted_regexes=True)
+
+    overlapping = route(r"<re:(?P<a>\w*\w*\w*\w*)$>", lambda: None, name="a")
+    with pytest.raises(RouterConfigurationError, match="may backtrack"):
+        Router((route(""), overlapping), vetted_regexes=True)
+
+
+def test_lazy_routes():
+    lazy_routes = [
+        lazy_route("/", handlers.home_handler, name="lazy-home"),
+        lazy_route(
+            "lazy/",
+            subroutes=(
+                lazy_route(
+                    "<re:(?P<code>^[a-z]{2}$)>/", handlers.catchall, name="lazy-code"
+                ),
+                route("<int:id>/", handlers.int_handler, name="lazy-id"),
+            ),
+        ),
+    ]
+    assert all(isinstance(lazy, LazyRoute) for lazy in lazy_routes)
+
+    router = Router(lazy_routes)
+    assert router.match("/").handler_name == "lazy-home"
+    assert router.match("/lazy/fr/").kwargs == {"code": "fr"}
+    assert router.find("lazy-id", id=5) == "/lazy/5/"
+    assert Router(lazy_routes[1:]).match("/lazy/5/").handler_name == "lazy-id"
+
+
+def test_lazy_router():
+    router = Router(routes, lazy=True)
+    assert not router.frozen
+    assert router.match("/int/5/").kwargs == {"id": 5}
+    assert router.frozen
+
+    router = Router(routes, lazy=True)
+    assert router.find("int", id=5) == "/int/5/"
+
+    router = Router(routes, lazy=True)
+    router.freeze()
+    assert router.frozen
+    assert router.tree_nodes
+    with pytest.raises(AttributeError):
+        router.unknown_attribute
+
+
+def test_lazy_router_configuration_error():
+    router = Router([route("a/"), route("a/")], lazy=True)
+    with pytest.raises(RouterConfigurationError):
+        router.match("/a/")
+    with pytest.raises(RouterConfigurationError):
+        router.freeze()
+
+
+def test_lazy_router_frozen_once_between_threads():
+    router = Router(routes, lazy=True)
+    matches = []
+
+    def match():
+        matches.append(router.match("/int/5/").kwargs)
+
+    threads = [threading.Thread(target=match) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert matches == [{"id": 5}] * 8
+
+
+def test_lazy_router_used_while_built(monkeypatch):
+    from yrouter import router as router_module
+
+    building, release = threading.Event(), threading.Event()
+
+    class BlockingStats(router_module.RouteStats):
+        def __init__(self, *args, **kwargs):
+            building.set()
+            release.wait(5)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(router_module, "RouteStats", BlockingStats)
+    router = Router(routes, lazy=True, stats=True)
+    builder = threading.Thread(target=router.freeze)
+    builder.start()
+    building.wait(5)
+
+    # Read by another thread while the misses are built but not the stats.
+    snapshots = []
+    reader = threading.Thread(target=lambda: snapshots.append(router.stats()))
+    reader.start()
+    reader.join(0.05)
+    assert reader.is_alive()
+
+    release.set()
+    builder.join()
+    reader.join()
+    assert snapshots[0]["misses"] == {}
+    assert "int" in {route["name"] for route in snapshots[0]["routes"].values()}
+    assert router.misses
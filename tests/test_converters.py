@@ -1,7 +1,17 @@
 import pytest
 
-from yrouter import REFUSED, AbstractConverter, NoMatch, Router, UnknownConverter, route
+from yrouter import (
+    REFUSED,
+    AbstractConverter,
+    NoMatch,
+    Router,
+    RouterConfigurationError,
+    UnknownConverter,
+    route,
+)
 from yrouter.converters import (
+    ChoiceConverter,
+    DateConverter,
     ExactConverter,
     IntConverter,
     PathConverter,
@@ -13,6 +23,8 @@ from yrouter.converters import (
     get_converters,
 )
 
+from . import handlers
+
 
 def test_get_register_discard_converters():
     default_converters = {
@@ -23,6 +35,8 @@ def test_get_register_discard_converters():
         "uuid": UUIDConverter,
         "path": PathConverter,
         "slug": SlugConverter,
+        "date": DateConverter,
+        "choice": ChoiceConverter,
     }
 
     assert get_converters() == default_converters
@@ -58,6 +72,8 @@ def test_int_converter():
 
     assert converter.accepts("1.0") == REFUSED
     assert converter.accepts("hello") == REFUSED
+    assert converter.accepts("²") == REFUSED
+    assert converter.accepts("1" * 5000) == REFUSED
 
 
 def test_str_converter():
@@ -98,6 +114,45 @@ def test_uuid_converter():
     assert converter.accepts(uuid[:-1]) == REFUSED
 
 
+def test_choice_converter():
+    converter = ChoiceConverter("<choice:lang:en|fr>", "lang:en|fr")
+    assert converter.identifier == "lang"
+    assert converter.choices == {"en", "fr"}
+
+    accepts, accepted = converter.accepts("en")
+    assert accepts
+    assert accepted == {"lang": "en"}
+
+    assert converter.accepts("") == REFUSED
+    assert converter.accepts("en|fr") == REFUSED
+
+    expected = "No choices provided for the choice converter '<choice:lang>'."
+    with pytest.raises(RouterConfigurationError, match=expected):
+        route("<choice:lang>/")
+
+
+def test_choice_converter_routes():
+    languages = "|".join(f"l{i}" for i in range(500))
+    routes = (
+        route(""),
+        route("en/", lambda: None, name="english"),
+        route(f"<choice:lang:en|{languages}>/", lambda: None, name="lang"),
+        route("l1/", lambda: None, name="shadowed"),
+        route("<str:word>/", lambda: None, name="word"),
+    )
+    router = Router(routes)
+    assert len(router.tree.matchers) == 2
+
+    assert router.match("en/").handler_name == "english"
+    assert router.match("l1/").handler_name == "lang"
+    assert router.match("l499/").kwargs == {"lang": "l499"}
+    assert router.match("de/").handler_name == "word"
+    assert not router.match("l500/")
+
+    assert router.find("lang", lang="l42") == "/l42/"
+    assert router.find("lang", lang="de") is None
+
+
 def test_register_new_converter_without_accepts_method():
     class CustomConverter(AbstractConverter, converter_name="custom"):
         pass
@@ -140,3 +195,103 @@ def test_hash_converter():
 
     converter = Converter(description="converter")
     assert hash(converter) == id(converter)
+
+
+def test_cached_converter(monkeypatch):
+    calls = []
+
+    class TenantConverter(AbstractConverter, converter_name="tenant", cache_size=2):
+        def accepts(self, value):
+            calls.append(value)
+            return (True, {self.identifier: value}) if value.islower() else REFUSED
+
+    try:
+        router = Router(
+            [
+                route("<tenant:tenant>/", handlers.home_handler, name="tenant"),
+                route("x/<tenant:other>/", handlers.home_handler),
+            ],
+            cache_size=0,
+        )
+        assert router.match("/acme/").kwargs == {"tenant": "acme"}
+        assert router.match("/acme/").kwargs == {"tenant": "acme"}
+        assert router.match("/ACME/") is NoMatch
+        assert router.match("/ACME/") is NoMatch
+        assert calls == ["acme", "ACME"]
+        assert router.converter_cache_stats() == {
+            "tenant": {"size": 2, "hits": 2, "misses": 2, "hit_rate": 0.5}
+        }
+
+        # The oldest result is evicted.
+        router.match("/other/")
+        assert ("<tenant:tenant>", "acme") not in TenantConverter.cache.entries
+
+        TenantConverter.cache.invalidate("other")
+        router.match("/other/")
+        assert calls == ["acme", "ACME", "other", "other"]
+        TenantConverter.cache.invalidate()
+        assert TenantConverter.cache.entries == {}
+
+        TenantConverter.cache.ttl = 10
+        router.match("/acme/")
+        monkeypatch.setattr("yrouter.cache.monotonic", lambda: float("inf"))
+        router.match("/acme/")
+        assert calls[-2:] == ["acme", "acme"]
+    finally:
+        discard_converter("tenant")
+
+    with pytest.raises(
+        RouterConfigurationError, match="must cache at least one result"
+    ):
+
+        class EmptyCacheConverter(
+            AbstractConverter, converter_name="empty", cache_size=0
+        ):
+            pass
+
+    assert "empty" not in get_converters()
+
+    with pytest.raises(
+        RouterConfigurationError, match="must match at least one segment"
+    ):
+
+        class NoSegmentConverter(AbstractConverter, converter_name="seg0", segments=0):
+            pass
+
+    assert "seg0" not in get_converters()
+
+
+def test_cached_converter_invalidated_through_match_cache():
+    tenants = {"acme"}
+
+    class TenantConverter(AbstractConverter, converter_name="tenant", cache_size=8):
+        def accepts(self, value):
+            return (True, {self.identifier: value}) if value in tenants else REFUSED
+
+    try:
+        router = Router(
+            [
+                route(
+                    "t/",
+                    subroutes=[
+                        route("<tenant:tenant>/", handlers.home_handler, name="tenant"),
+                        route("about/", handlers.home_handler, name="about"),
+                    ],
+                ),
+                route("int/<int:id>/", handlers.int_handler, name="int"),
+            ]
+        )
+        assert router.match("/t/acme/").handler_name == "tenant"
+        assert router.match("/t/about/").handler_name == "about"
+        assert router.match("/int/5/").handler_name == "int"
+        assert router.cache.get("/int/5/") is not None
+        assert router.cache.get("/t/acme/") is None
+        assert "/t/about/" not in router.precomputed
+
+        tenants.symmetric_difference_update({"acme", "about"})
+        assert router.match("/t/acme/").handler_name == "tenant"
+        TenantConverter.cache.invalidate()
+        assert router.match("/t/acme/") is NoMatch
+        assert router.match("/t/about/").handler_name == "tenant"
+    finally:
+        discard_converter("tenant")
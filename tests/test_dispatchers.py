@@ -0,0 +1,208 @@
+import asyncio
+from urllib.parse import unquote_to_bytes
+
+import pytest
+
+from yrouter import Router, route
+from yrouter.asgi import ASGIDispatcher
+from yrouter.wsgi import WSGIDispatcher
+
+
+async def asgi_user(scope, receive, send, username):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": username.encode()})
+
+
+def wsgi_user(environ, start_response, username):
+    start_response("200 OK", [])
+    return [username.encode()]
+
+
+def asgi_request(app, path, method="GET", query_string=b"", raw_path=None):
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "raw_path": raw_path,
+        "query_string": query_string,
+        "headers": [],
+    }
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app(scope, None, send))
+    start, body = messages
+    return start["status"], dict(start["headers"]), body["body"]
+
+
+def test_asgi_dispatcher():
+    app = ASGIDispatcher(
+        Router([route("users/<str:username>/", {"GET": asgi_user}, name="user")])
+    )
+
+    assert asgi_request(app, "/users/alice/") == (200, {}, b"alice")
+    assert asgi_request(app, "", raw_path=b"/users/J%C3%B6rg/")[2] == "Jörg".encode()
+    assert asgi_request(app, "/users/alice", query_string=b"a=1") == (
+        301,
+        {b"location": b"/users/alice/?a=1", b"content-length": b"0"},
+        b"",
+    )
+    assert asgi_request(app, "/articles/") == (
+        404,
+        {b"content-type": b"text/plain; charset=utf-8", b"content-length": b"9"},
+        b"Not Found",
+    )
+    status, headers, _ = asgi_request(app, "/users/alice/", method="POST")
+    assert status == 405
+    assert headers[b"allow"] == b"GET"
+
+
+def test_asgi_lifespan():
+    app = ASGIDispatcher(Router([route("/", asgi_user)]))
+    received = iter([{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}])
+    sent = []
+
+    async def receive():
+        return next(received)
+
+    async def send(message):
+        sent.append(message["type"])
+
+    asyncio.run(app({"type": "lifespan"}, receive, send))
+    assert sent == ["lifespan.startup.complete", "lifespan.shutdown.complete"]
+
+
+def wsgi_request(app, path, method="GET", query_string="", raw_uri=None):
+    environ = {
+        "PATH_INFO": path,
+        "REQUEST_METHOD": method,
+        "QUERY_STRING": query_string,
+    }
+    if raw_uri is not None:
+        environ["RAW_URI"] = raw_uri
+    responses = []
+    body = app(
+        environ, lambda status, headers: responses.append((status, dict(headers)))
+    )
+    return (*responses[0], b"".join(body))
+
+
+def test_wsgi_dispatcher():
+    app = WSGIDispatcher(
+        Router([route("users/<str:username>/", {"GET": wsgi_user}, name="user")])
+    )
+
+    assert wsgi_request(app, "/users/alice/") == ("200 OK", {}, b"alice")
+    # WSGI paths are decoded by the server, then given as latin-1.
+    path = "/users/Jörg".encode().decode("latin-1")
+    assert wsgi_request(app, path + "/")[2] == "Jörg".encode()
+    assert wsgi_request(app, path, query_string="a=1") == (
+        "301 Moved Permanently",
+        {"Location": "/users/J%C3%B6rg/?a=1", "Content-Length": "0"},
+        b"",
+    )
+    assert wsgi_request(app, "/users/1/") == (
+        "404 Not Found",
+        {"Content-Type": "text/plain; charset=utf-8", "Content-Length": "9"},
+        b"Not Found",
+    )
+    assert wsgi_request(app, "/users/\xff/")[0] == "404 Not Found"
+    status, headers, _ = wsgi_request(app, "/users/alice/", method="POST")
+    assert status == "405 Method Not Allowed"
+    assert headers["Allow"] == "GET"
+
+
+async def asgi_file(scope, receive, send, name):
+    await asgi_user(scope, receive, send, name)
+
+
+def wsgi_file(environ, start_response, name):
+    return wsgi_user(environ, start_response, name)
+
+
+@pytest.mark.parametrize(
+    "raw_path, status, location, body",
+    [
+        (b"/users/J%C3%B6rg/", 200, None, "Jörg".encode()),
+        (b"/users/J%C3%B6rg", 301, b"/users/J%C3%B6rg/", b""),
+        (b"/files/a%2Fb/", 200, None, b"a/b"),
+        (b"/files/a%2Fb", 301, b"/files/a%2Fb/", b""),
+        (b"/files/100%25", 301, b"/files/100%25/", b""),
+        (b"/files/a/b/", 404, None, b"Not Found"),
+    ],
+)
+def test_dispatchers_route_alike(raw_path, status, location, body):
+    routes = [
+        route("users/<str:username>/", {"GET": asgi_user}, name="user"),
+        route("files/<re:(?P<name>.+)>/", {"GET": asgi_file}, name="file"),
+    ]
+    wsgi_routes = [
+        route("users/<str:username>/", {"GET": wsgi_user}, name="user"),
+        route("files/<re:(?P<name>.+)>/", {"GET": wsgi_file}, name="file"),
+    ]
+    # Servers give the decoded path along with the raw one.
+    path = unquote_to_bytes(raw_path)
+
+    asgi_status, asgi_headers, asgi_body = asgi_request(
+        ASGIDispatcher(Router(routes)), path.decode(), raw_path=raw_path
+    )
+    assert (asgi_status, asgi_headers.get(b"location"), asgi_body) == (
+        status,
+        location,
+        body,
+    )
+
+    wsgi_status, wsgi_headers, wsgi_body = wsgi_request(
+        WSGIDispatcher(Router(wsgi_routes)),
+        path.decode("latin-1"),
+        query_string="a=1",
+        raw_uri=raw_path.decode("latin-1") + "?a=1",
+    )
+    wsgi_location = wsgi_headers.get("Location")
+    assert (int(wsgi_status[:3]), wsgi_location, wsgi_body) == (
+        status,
+        location and location.decode() + "?a=1",
+        body,
+    )
+
+
+def test_dispatchers_lazy_router():
+    routes = [route("users/<str:username>/", {"GET": asgi_user}, name="user")]
+    app = ASGIDispatcher(Router(routes, lazy=True))
+    assert asgi_request(app, "/users/alice/") == (200, {}, b"alice")
+
+    routes = [route("users/<str:username>/", {"GET": wsgi_user}, name="user")]
+    app = WSGIDispatcher(Router(routes, lazy=True))
+    assert wsgi_request(app, "/users/alice/") == ("200 OK", {}, b"alice")
+
+
+def test_asgi_websocket():
+    async def chat(scope, receive, send, room):
+        await send({"type": "websocket.accept", "subprotocol": room})
+
+    app = ASGIDispatcher(
+        Router(
+            [
+                route("rooms/<str:room>/", {"GET": chat}, name="room"),
+                route("posts/", {"POST": chat}, name="posts"),
+            ]
+        )
+    )
+
+    def connect(path):
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {"type": "websocket", "path": path, "headers": []}
+        asyncio.run(app(scope, None, send))
+        return sent
+
+    assert connect("/rooms/lobby/") == [
+        {"type": "websocket.accept", "subprotocol": "lobby"}
+    ]
+    assert connect("/posts/") == [{"type": "websocket.close", "code": 1000}]
+    assert connect("/unknown/") == [{"type": "websocket.close", "code": 1000}]
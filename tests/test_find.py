@@ -1,5 +1,9 @@
+import pytest
+
 from yrouter import REFUSED, AbstractConverter, Router, route
 
+from .routes import routes
+
 
 def test_find_int(router):
     path = router.find("int", id=5)
@@ -106,3 +110,61 @@ def test_find_with_custom_converter():
     assert router.find("letters") is None
     assert router.find("letters", letter="ALPHa") is None
     assert router.find("letters", letter="ALPHA", word="word") is None
+
+
+@pytest.mark.parametrize(
+    "handler_name, kwargs",
+    [
+        ("home", {}),
+        ("int", {"id": 5}),
+        ("int", {"id": "05"}),
+        ("int", {"id": "five"}),
+        ("int", {}),
+        ("articles-year-month-day", {"year": 2020, "month": 1, "day": 30}),
+        ("articles-year-month-day", {"year": 2020, "month": 1}),
+        ("articles-year-month-day", {"year": 2020, "month": 1, "day": 3, "x": 1}),
+        ("newest-in-category", {"category": "sport"}),
+        ("users-slug", {"slug": "user-123"}),
+        ("items", {"id": "8fcc1854-50a8-11ec-83dc-479fd603abba"}),
+        ("items", {"id": "8fcc1854"}),
+        ("static", {"path": "images/original/hero.jpg"}),
+        ("path-id", {"path": "folders/new", "id": 1}),
+        ("catchall", {"catched": "whatever"}),
+        ("catchall", {}),
+        ("unknown", {}),
+    ],
+)
+@pytest.mark.parametrize("append_slash", [True, False])
+def test_url_builder(handler_name, kwargs, append_slash):
+    router = Router(routes, append_slash=append_slash)
+    builder = router.url_builder(handler_name)
+
+    assert builder(**kwargs) == router.find(handler_name, **kwargs)
+    assert router.url_builder(handler_name) is builder
+
+
+def test_url_builder_duplicate_names():
+    router = Router(
+        (
+            route("", lambda: None, name="duplicate"),
+            route("duplicate/<int:id>/", lambda: None, name="duplicate"),
+        )
+    )
+    builder = router.url_builder("duplicate")
+
+    assert len(builder.templates) == 2
+    assert builder() == "/"
+    assert builder(id=5) == "/duplicate/5/"
+    assert builder(id="x") is None
+
+
+def test_find_many(router):
+    kwargs = ({"year": 2020, "month": month, "day": 1} for month in range(1, 4))
+    paths = router.find_many("articles-year-month-day", kwargs)
+
+    assert list(paths) == [
+        "/articles/2020/1/1/",
+        "/articles/2020/2/1/",
+        "/articles/2020/3/1/",
+    ]
+    assert list(router.find_many("int", [{"id": 1}, {"id": "x"}])) == ["/int/1/", None]
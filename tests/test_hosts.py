@@ -0,0 +1,89 @@
+from uuid import UUID
+
+from yrouter import NoMatch, Router, route
+
+from .routes import routes
+
+shared = route("shared/<int:id>", lambda: None, name="shared")
+api_routes = (route(""), route("api/", lambda: None, name="api"), shared)
+tenant_routes = (route("", lambda: None, name="tenant-home"), shared)
+
+
+def get_router(**kwargs):
+    return Router(
+        routes,
+        hosts={
+            "api.example.com": api_routes,
+            "API2.example.com": api_routes,
+            "<slug:tenant>.example.com": tenant_routes,
+            "<slug:tenant>.<choice:region:eu|us>.example.com": tenant_routes,
+        },
+        **kwargs,
+    )
+
+
+def test_match_exact_host():
+    router = get_router()
+
+    match = router.match("/api/", host="api.example.com")
+    assert match.handler_name == "api"
+    assert match.kwargs == {}
+
+    match = router.match("/api/", host="Api2.Example.com:8000")
+    assert match.handler_name == "api"
+
+    assert router.match("/api/", host="tenant.example.com") is NoMatch
+    assert router.match("/api/") is NoMatch
+
+
+def test_match_host_pattern():
+    router = get_router()
+
+    match = router.match("/", host="acme.example.com")
+    assert match.handler_name == "tenant-home"
+    assert match.kwargs == {"tenant": "acme"}
+
+    match = router.match("/shared/5/", host="acme.eu.example.com")
+    assert match.handler_name == "shared"
+    assert match.kwargs == {"tenant": "acme", "region": "eu", "id": 5}
+
+    match = router.match("/shared/5/", host="acme.eu.example.com", method="GET")
+    assert match.kwargs == {"tenant": "acme", "region": "eu", "id": 5}
+
+
+def test_match_unknown_host_uses_default_routes():
+    router = get_router()
+
+    match = router.match("/int/5/", host="acme.asia.example.com")
+    assert match.handler_name == "int"
+    assert match.kwargs == {"id": 5}
+
+    assert router.match("/int/5/", host="localhost").handler_name == "int"
+
+
+def test_hosts_share_routers_and_subtrees():
+    router = get_router(cache_size=0)
+
+    api, _ = router.hosts.resolve("api.example.com")
+    assert router.hosts.resolve("api2.example.com")[0] is api
+
+    tenant, _ = router.hosts.resolve("acme.example.com")
+    assert router.hosts.resolve("acme.us.example.com")[0] is tenant
+    assert tenant is not api
+
+    assert api.tree.children[1] is shared
+    assert tenant.tree.children[0] is shared
+
+
+def test_match_host_lazy_kwargs():
+    uuid = "23ff7800-50a8-11ec-83dc-479fd603abba"
+    item = route("items/<uuid:id>", lambda: None, name="item")
+    router = Router(
+        routes,
+        hosts={"<slug:tenant>.example.com": (route(""), item)},
+        lazy_kwargs=True,
+        native_uuids=True,
+    )
+
+    match = router.match(f"/items/{uuid}/", host="acme.example.com")
+    assert match.kwargs == {"tenant": "acme", "id": UUID(uuid)}
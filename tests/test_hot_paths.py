@@ -0,0 +1,137 @@
+import functools
+import json
+import threading
+
+import pytest
+
+from yrouter import NoMatch, Router, route
+from yrouter.hot_paths import parse_access_log
+
+from .routes import routes
+
+ACCESS_LOG = [
+    '10.0.0.1 - - [19/Oct/2026:10:00:00 +0000] "GET /articles/2015/04/12 HTTP/1.1" 301 0',
+    '10.0.0.2 - - [19/Oct/2026:10:00:01 +0000] "GET /int/5/?page=2 HTTP/1.1" 200 12',
+    '10.0.0.3 - - [19/Oct/2026:10:00:02 +0000] "POST /int/5/ HTTP/1.1" 200 12',
+    '10.0.0.4 - - [19/Oct/2026:10:00:03 +0000] "GET /unknown-1/ HTTP/1.1" 404 0',
+    "garbage",
+]
+
+
+@pytest.fixture
+def dump_path(tmp_path):
+    return str(tmp_path / "hot_paths.json")
+
+
+def test_warm_up_from_access_log():
+    router = Router(routes)
+    assert router.warm_up(parse_access_log(ACCESS_LOG), limit=1) == 1
+    assert list(router.hot_paths) == ["/int/5/"]
+
+    router = Router(routes)
+    assert router.warm_up(parse_access_log(ACCESS_LOG)) == 2
+
+    match = router.match("/articles/2015/04/12")
+    assert match.kwargs == {"year": 2015, "month": 4, "day": 12}
+    assert match.redirect_to == "/articles/2015/04/12/"
+    match.kwargs["year"] = 0
+    assert router.match("/articles/2015/04/12").kwargs["year"] == 2015
+    assert router.match("/unknown-1/") is NoMatch
+
+
+def test_hot_paths_shared_between_threads():
+    router = Router(routes)
+    router.warm_up(["/int/5/"])
+    router.hot_paths["/int/5/"].kwargs["id"] = 6
+
+    matches = []
+    thread = threading.Thread(target=lambda: matches.append(router.match("/int/5/")))
+    thread.start()
+    thread.join()
+    assert matches[0].kwargs == {"id": 6}
+
+
+def test_dump_and_load(dump_path):
+    router = Router(routes)
+    router.warm_up(parse_access_log(ACCESS_LOG))
+    assert router.dump_hot_paths(dump_path) == 2
+
+    restarted = Router(routes)
+    assert restarted.load_hot_paths(dump_path) == 2
+    assert list(restarted.hot_paths) == list(router.hot_paths)
+    match = restarted.match("/articles/2015/04/12")
+    assert match.handler_name == "articles-year-month-day"
+    assert match.kwargs == {"year": 2015, "month": 4, "day": 12}
+    assert match.should_redirect
+
+
+def test_load_after_redeploy(dump_path):
+    def make_routes(handler):
+        return [route(""), route("<int:id>/", handler, name="id")]
+
+    router = Router(make_routes(functools.partial(print, "first")))
+    router.warm_up(["/5/"])
+    router.dump_hot_paths(dump_path)
+
+    # Handlers declared elsewhere, or partials, don't change the route table.
+    redeployed = Router(make_routes(functools.partial(print, "second")))
+    assert redeployed.fingerprint() == router.fingerprint()
+    assert redeployed.load_hot_paths(dump_path) == 1
+    assert redeployed.match("/5/").handler.args == ("second",)
+
+
+def test_load_ignores_dumps_of_other_routes(dump_path):
+    router = Router(routes)
+    router.warm_up(["/int/5/"])
+    router.dump_hot_paths(dump_path)
+
+    other = Router([route("/int/<int:id>/", name="other")])
+    assert other.load_hot_paths(dump_path) == 0
+    assert other.hot_paths == {}
+
+    assert Router(routes).load_hot_paths(dump_path + ".missing") == 0
+    with open(dump_path, "w") as f:
+        f.write("{")
+    assert Router(routes).load_hot_paths(dump_path) == 0
+
+
+def test_dump_live_traffic(dump_path):
+    router = Router(routes, hot_path_sample_rate=1)
+    for _ in range(3):
+        router.match("/int/5/")
+    router.match("/articles/2015/")
+    router.match("/unknown-1/")
+    router.warm_up(["/users/alice/"])
+
+    assert "/unknown-1/" not in dict(router.path_sampler.most_common(10))
+    assert Router(routes).path_sampler is None
+    assert router.dump_hot_paths(dump_path, limit=2) == 2
+    restarted = Router(routes)
+    restarted.load_hot_paths(dump_path)
+    assert list(restarted.hot_paths) == ["/int/5/", "/articles/2015/"]
+
+    assert router.dump_hot_paths(dump_path) == 3
+    restarted.load_hot_paths(dump_path)
+    assert list(restarted.hot_paths) == ["/int/5/", "/articles/2015/", "/users/alice/"]
+
+
+def test_load_skips_malformed_entries(dump_path):
+    router = Router(routes)
+    router.warm_up(["/int/5/"])
+    router.dump_hot_paths(dump_path)
+
+    with open(dump_path) as f:
+        data = json.load(f)
+    data["entries"] += [
+        ["/int/6/", 10_000, {}],
+        ["/int/7/", -1, {}],
+        ["/int/8/", "1", {}],
+        ["/int/9/"],
+        "/int/10/",
+    ]
+    with open(dump_path, "w") as f:
+        json.dump(data, f)
+
+    restarted = Router(routes)
+    assert restarted.load_hot_paths(dump_path) == 1
+    assert list(restarted.hot_paths) == ["/int/5/"]
@@ -1,8 +1,15 @@
+from datetime import date
+from urllib.parse import unquote
+from uuid import UUID
+
 import pytest
 
-from yrouter import NoMatch
+from yrouter import REFUSED, AbstractConverter, MethodNotAllowed, NoMatch, Router, route
+from yrouter.converters import discard_converter
+from yrouter.route_node import AdaptiveGroup, RegexAlternation, StaticIndex
 
 from . import handlers
+from .routes import routes
 
 
 def test_match_2020(router):
@@ -113,3 +120,351 @@ def test_match_with_empty_handler(router):
 def test_match_bool(router):
     assert router.match("/articles/2015/")
     assert not router.match("/articles/year-2015/")
+
+
+def test_match_regex_siblings():
+    routes = (
+        route(""),
+        route(r"<re:page-(?P<page>\d+)$>", lambda: None, name="page"),
+        route(r"<re:tag-(?P<page>[a-z]+)$>", lambda: None, name="tag"),
+        route(r"<re:(?P<twice>[a-z])(?P=twice)$>", lambda: None, name="twice"),
+        route(r"<re:(?P<word>^[a-z]+$)>", lambda: None, name="word"),
+    )
+    router = Router(routes)
+
+    matchers = router.tree.matchers
+    assert len(matchers) == 3
+    assert isinstance(matchers[0], RegexAlternation)
+
+    match = router.match("page-3/")
+    assert match.handler_name == "page"
+    assert match.kwargs == {"page": "3"}
+
+    match = router.match("tag-new/")
+    assert match.handler_name == "tag"
+    assert match.kwargs == {"page": "new"}
+
+    match = router.match("hello/")
+    assert match.handler_name == "word"
+    assert match.kwargs == {"word": "hello"}
+
+    match = router.match("aa/")
+    assert match.handler_name == "twice"
+    assert match.kwargs == {"twice": "a"}
+
+    assert router.match("page-/") is NoMatch
+
+
+def test_match_method():
+    def list_users():
+        pass
+
+    def create_user():
+        pass
+
+    def user_details():
+        pass
+
+    router = Router(
+        (
+            route(""),
+            route(
+                "users/",
+                {"get": list_users, "POST": create_user},
+                name="users",
+                subroutes=(route("<int:id>", user_details, name="user-details"),),
+            ),
+        )
+    )
+
+    match = router.match("/users/", method="GET")
+    assert match.handler is list_users
+    assert match.handler_name == "users"
+
+    match = router.match("/users", method="POST")
+    assert match.handler is create_user
+    assert router.match("/users", method="post").handler is create_user
+    assert match.should_redirect
+
+    not_allowed = router.match("/users/", method="DELETE")
+    assert isinstance(not_allowed, MethodNotAllowed)
+    assert not not_allowed
+    assert not_allowed.allowed_methods == {"GET", "POST"}
+    assert not_allowed.handler_name == "users"
+    assert router.match("/users/", method="OPTIONS") is not_allowed
+
+    assert router.match("/users/1/", method="DELETE").handler is user_details
+    assert router.match("/users/1/", method="DELETE").kwargs == {"id": 1}
+    assert router.match("/groups/", method="GET") is NoMatch
+
+    # Without a method, the handlers of all methods are returned
+    assert router.match("/users/").handler == {"GET": list_users, "POST": create_user}
+    assert router.find("users") == "/users/"
+
+
+def test_match_long_path_converter(router):
+    path = "/".join(["a"] * 10000)
+    match = router.match(f"/static/{path}/")
+    assert match.handler_name == "static"
+    assert match.kwargs == {"path": path}
+
+
+def test_match_guards():
+    router = Router(routes, max_path_length=32, max_segments=4)
+
+    assert router.match("/articles/2015/04/12/").handler_name == (
+        "articles-year-month-day"
+    )
+    assert router.match("/articles/2015/04/12/1/") is NoMatch
+    assert router.match("/static/a/b/c/d/") is NoMatch
+    assert router.match(f"/int/{'1' * 32}/") is NoMatch
+    assert router.match(f"/int/{'1' * 5000}/") is NoMatch
+
+
+def test_match_long_paths_not_kept():
+    router = Router(routes, max_path_length=32, hot_path_sample_rate=1)
+    path = f"/int/{'1' * 5000}/"
+
+    assert router.match(path) is NoMatch
+    assert router.cache.get(path) is None
+    assert router.path_sampler.most_common(10) == []
+
+
+def test_match_adaptive_order():
+    routes = (
+        route(""),
+        route("<int:id>/", lambda: None, name="id"),
+        route("<str:word>/", lambda: None, name="word"),
+        route("<choice:lang:en-us|fr-fr>/", lambda: None, name="lang"),
+        route("<slug:slug>/", lambda: None, name="slug"),
+    )
+    router = Router(routes, cache_size=0, adaptive=True)
+
+    group, slug = router.tree.matchers
+    assert isinstance(group, AdaptiveGroup)
+    assert len(group.entries) == 3
+    langs = group.entries[2][0]
+    assert isinstance(langs, StaticIndex)
+
+    for _ in range(group.interval):
+        assert router.match("fr-fr/").kwargs == {"lang": "fr-fr"}
+
+    # The most accepting matcher is now tried first.
+    assert group.entries[0][0] is langs
+
+    assert router.match("5/").handler_name == "id"
+    assert router.match("hello/").handler_name == "word"
+    assert router.match("hello-5/").handler_name == "slug"
+
+
+def test_match_adaptive_custom_converter():
+    calls = []
+
+    class LookupConverter(AbstractConverter, converter_name="lookup"):
+        def accepts(self, value):
+            calls.append(value)
+            return (True, {self.identifier: value}) if value == "known" else REFUSED
+
+    try:
+        router = Router(
+            (
+                route(""),
+                route("new/", lambda: None, name="new"),
+                route("<lookup:key>/", lambda: None, name="lookup"),
+            ),
+            adaptive=True,
+        )
+        # Not grouped with the static route, since that would call it when building.
+        assert calls == []
+        assert not isinstance(router.tree.matchers[0], AdaptiveGroup)
+        assert router.match("/known/").handler_name == "lookup"
+    finally:
+        discard_converter("lookup")
+
+
+def test_match_adaptive_shared_routes():
+    routes = (
+        route(""),
+        route(
+            "items/",
+            subroutes=(
+                route("<int:id>/", lambda: None, name="id"),
+                route("<str:word>/", lambda: None, name="word"),
+            ),
+        ),
+    )
+
+    def items_matchers(router):
+        return router.tree.children[0].matchers
+
+    plain = Router(routes)
+    adaptive = Router(routes, adaptive=True)
+    assert isinstance(items_matchers(adaptive)[0], AdaptiveGroup)
+    assert not isinstance(items_matchers(plain)[0], AdaptiveGroup)
+
+    # Routers built afterwards from the same routes, or from the tree of the
+    # adaptive router, don't share its adaptive matchers.
+    for tree in (routes, [adaptive.tree]):
+        other = Router(tree)
+        assert not isinstance(items_matchers(other)[0], AdaptiveGroup)
+        assert other.match("/items/5/").handler_name == "id"
+    other = Router([adaptive.tree], adaptive=True)
+    assert items_matchers(other)[0] is not items_matchers(adaptive)[0]
+
+
+@pytest.mark.parametrize(
+    "path, handler_name, expected_kwargs",
+    [
+        (b"/users/alice/", "user-details", {"username": "alice"}),
+        (memoryview(b"/users/alice/"), "user-details", {"username": "alice"}),
+        (b"/users/J%C3%B6rg/", "user-details", {"username": "Jörg"}),
+        (b"/users/J%C3%B6rg%20M/", "users-slug", {"slug": "Jörg M"}),
+        (b"/%61rticles/", "articles_routes", {}),
+        (b"/int/%35/", "int", {"id": 5}),
+    ],
+)
+def test_match_raw_path(path, handler_name, expected_kwargs):
+    router = Router(routes)
+    match = router.match(path)
+    assert match.handler_name == handler_name
+    assert match.kwargs == expected_kwargs
+    # Raw paths are matched like the decoded path.
+    decoded = unquote(bytes(path).decode())
+    assert router.match(decoded).handler_name == handler_name
+    assert router.match(decoded).kwargs == expected_kwargs
+    # Cached results of raw paths aren't decoded twice.
+    assert router.match(path).kwargs == expected_kwargs
+
+
+def test_match_raw_path_encoded_slashes():
+    router = Router(routes)
+    # Encoded slashes don't split segments.
+    assert router.match(b"/static/a%2Fb/c/").kwargs == {"path": "a/b/c"}
+    match = router.match(b"/users/a%2Fb/")
+    assert match.handler_name == "users-slug"
+    assert match.kwargs == {"slug": "a/b"}
+    assert router.match("/users/a/b/") is NoMatch
+
+    assert router.match(b"/users/\xff/") is NoMatch
+    assert router.match(b"/users/%FF/") is NoMatch
+    # Decoded paths aren't decoded again.
+    assert router.match("/users/J%C3%B6rg/").kwargs == {"slug": "J%C3%B6rg"}
+
+    # Redirections are encoded like the raw path.
+    match = router.match(b"/users/J%C3%B6rg")
+    assert match.kwargs == {"username": "Jörg"}
+    assert match.redirect_to == "/users/J%C3%B6rg/"
+    assert router.match(b"/users/a%2Fb").redirect_to == "/users/a%2Fb/"
+
+
+def test_match_multi_segment_converter():
+    router = Router(
+        [
+            route(
+                "archive/",
+                subroutes=(
+                    route(
+                        "<date:day>/",
+                        handlers.day_handler,
+                        name="archive-day",
+                        subroutes=(
+                            route("comments/", handlers.newest, name="comments"),
+                        ),
+                    ),
+                    route("<int:year>/", handlers.year_handler, name="archive-year"),
+                ),
+            ),
+        ]
+    )
+
+    match = router.match("/archive/2015/04/12/")
+    assert match.handler_name == "archive-day"
+    assert match.kwargs == {"day": date(2015, 4, 12)}
+    assert router.match("/archive/2015/").kwargs == {"year": 2015}
+    assert router.match("/archive/2015/04/12/comments/").handler_name == "comments"
+    assert router.match("/archive/2015/02/30/") is NoMatch
+    assert router.match("/archive/2015/04/") is NoMatch
+    assert router.match("/archive/2015/04/12").redirect_to == "/archive/2015/04/12/"
+
+    assert router.find("archive-day", day=date(2015, 4, 12)) == "/archive/2015/04/12/"
+    build = router.url_builder("archive-day")
+    assert build(day=date(2015, 4, 12)) == "/archive/2015/04/12/"
+
+
+def test_match_static_paths():
+    router = Router(
+        [
+            route("/", handlers.home_handler, name="home"),
+            route(
+                "api/v2/",
+                subroutes=(
+                    route("config/", handlers.newest, name="config"),
+                    route("<int:id>/", handlers.year_handler, name="api-id"),
+                ),
+            ),
+            route("<str:name>/", handlers.users_handler, name="user"),
+            route("health/", handlers.home_handler, name="health"),
+        ]
+    )
+    assert set(router.static_paths) == {
+        "/",
+        "",
+        "/api/v2/config/",
+        "/api/v2/config",
+        "/health/",
+        "/health",
+    }
+
+    match = router.match("/api/v2/config")
+    assert match.handler_name == "config"
+    assert match.redirect_to == "/api/v2/config/"
+    match.kwargs["changed"] = True
+    assert router.match("/api/v2/config/").kwargs == {}
+
+    # "/health/" is matched by the dynamic route declared before it.
+    assert router.static_paths["/health/"].handler_name == "user"
+    assert router.match("/health/").kwargs == {"name": "health"}
+    assert router.match("/").handler_name == "home"
+
+    strict = Router(routes, slash_policy="strict")
+    assert "/articles/" in strict.static_paths
+    assert "/articles" not in strict.static_paths
+    assert strict.match("/articles") is NoMatch
+
+
+def test_match_lazy_kwargs():
+    uuid = "23ff7800-50a8-11ec-83dc-479fd603abba"
+    item_routes = [
+        route(
+            "orgs/<uuid:org>/",
+            subroutes=(
+                route(
+                    "items/<int:id>/<slug:slug>/", handlers.uuid_handler, name="item"
+                ),
+            ),
+        )
+    ]
+    router = Router(item_routes, lazy_kwargs=True, native_uuids=True)
+
+    match = router.match(f"/orgs/{uuid.upper()}/items/5/a-slug/")
+    assert match.kwargs["slug"] == "a-slug"
+    assert not match.kwargs.converted
+    assert match.kwargs == {"org": UUID(uuid), "id": 5, "slug": "a-slug"}
+    assert list(match.kwargs) == ["org", "id", "slug"]
+    # Cached matches share their converted values.
+    assert router.match(f"/orgs/{uuid.upper()}/items/5/a-slug/").kwargs.converted
+
+    match = router.match(f"/orgs/{uuid}/items/5/J%C3%B6rg/".encode())
+    assert match.kwargs == {"org": UUID(uuid), "id": 5, "slug": "Jörg"}
+
+    router = Router(item_routes, native_uuids=True)
+    assert router.match(f"/orgs/{uuid}/items/5/a-slug/").kwargs == {
+        "org": UUID(uuid),
+        "id": 5,
+        "slug": "a-slug",
+    }
+    assert Router(item_routes).match(f"/orgs/{{{uuid}}}/items/5/a/").kwargs == {
+        "org": uuid,
+        "id": 5,
+        "slug": "a",
+    }
@@ -0,0 +1,78 @@
+import pytest
+
+from tests.handlers import catchall, home_handler, users_handler
+from yrouter import NoMatch, Router, RouterConfigurationError, route
+
+from .routes import routes
+
+
+@pytest.fixture(scope="module")
+def base():
+    return Router(routes)
+
+
+def child(node, component):
+    return next(child for child in node.children if child.component == component)
+
+
+def test_overlay_shares_untouched_subtrees(base):
+    tenant = base.overlay(
+        [route("users/<str:username>/", catchall, name="tenant-user")]
+    )
+
+    assert child(tenant.tree, "articles") is child(base.tree, "articles")
+    assert child(tenant.tree, "users") is not child(base.tree, "users")
+    users = child(tenant.tree, "users")
+    assert child(users, "<slug:slug>") is child(
+        child(base.tree, "users"), "<slug:slug>"
+    )
+
+    match = tenant.match("/users/alice/")
+    assert match.handler is catchall
+    assert tenant.find("tenant-user", username="alice") == "/users/alice/"
+    assert tenant.find("user-details", username="alice") is None
+    assert tenant.match("/articles/2020/").handler_name == "articles-2020"
+
+    assert base.match("/users/alice/").handler is users_handler
+    assert base.find("user-details", username="alice") == "/users/alice/"
+
+
+def test_overlay_adds_routes(base):
+    tenant = base.overlay(
+        [route("users/<str:username>/settings/", home_handler, name="settings")]
+    )
+    assert tenant.match("/users/alice/settings/").handler_name == "settings"
+    assert tenant.match("/users/alice/").handler is users_handler
+    assert base.match("/users/alice/settings/") is NoMatch
+
+    # Added routes come after the routes of the base at the same level.
+    tenant = base.overlay(
+        [route("tenant/", home_handler), route("tenant-1/", home_handler)]
+    )
+    assert tenant.match("/tenant/") is NoMatch
+    assert tenant.match("/tenant-1/").handler is home_handler
+
+
+def test_overlay_removes_routes(base):
+    tenant = base.overlay(removed_names=["user-details", "users-slug", "int"])
+    assert tenant.match("/users/alice/") is NoMatch
+    assert tenant.match("/int/5/") is NoMatch
+    assert all(node.component != "users" for node in tenant.tree.children)
+
+    tenant = base.overlay(removed_names=["articles_routes"])
+    assert tenant.match("/articles/") is NoMatch
+    assert tenant.match("/articles/2020/").handler_name == "articles-2020"
+    assert base.match("/articles/").handler_name == "articles_routes"
+
+
+def test_overlay_inherits_options():
+    base = Router(routes, slash_policy="strict", stats=True)
+    tenant = base.overlay([route("tenant/", home_handler)])
+    assert tenant.slash_policy == "strict"
+    assert tenant.match("/tenant") is NoMatch
+    assert tenant.route_stats is not None
+
+
+def test_overlay_unknown_removed_name(base):
+    with pytest.raises(RouterConfigurationError, match="No route named 'unknown'"):
+        base.overlay(removed_names=["unknown"])
@@ -0,0 +1,190 @@
+import types
+
+import pytest
+
+from yrouter import NoMatch, Router, RouterConfigurationError, route
+from yrouter.rebuild import subtree_digest
+from yrouter.route_node import handler_identity
+
+
+def make_handlers(version=1):
+    def user(version=version):
+        return version
+
+    def edit(version=version):
+        return version
+
+    return lambda: version, user, edit, lambda: -version
+
+
+def make_routes(version=1, extra=(), handlers=None):
+    home, user, edit, article_edit = handlers or make_handlers(version)
+    return [
+        route("/", home, name="home"),
+        route(
+            "users/<int:id>/",
+            {"GET": user},
+            name="user",
+            subroutes=(route("edit/", edit, name="user-edit"),),
+        ),
+        route(
+            "articles/<re:(?P<slug>^[a-z-]+$)>/",
+            user,
+            name="article",
+            subroutes=(route("edit/", article_edit, name="article-edit"),),
+        ),
+        *extra,
+    ]
+
+
+def child(node, component):
+    return next(child for child in node.children if child.component == component)
+
+
+def test_subtree_digest():
+    first, second = make_routes(), make_routes(2)
+    assert [subtree_digest(node) for node in first] == [
+        subtree_digest(node) for node in second
+    ]
+    assert subtree_digest(first[1]) != subtree_digest(first[2])
+    assert subtree_digest(route("users/<int:id>/", name="other")) != subtree_digest(
+        first[1]
+    )
+
+
+def test_handler_identity():
+    def handler():
+        pass
+
+    def declared_in(module):
+        function = types.FunctionType(handler.__code__, {"__name__": module})
+        function.__qualname__ = handler.__qualname__
+        return function
+
+    assert handler_identity(handler) == handler_identity(declared_in(__name__))
+    assert handler_identity(handler) != handler_identity(declared_in("elsewhere"))
+    assert handler_identity({"GET": handler}) == [("GET", handler_identity(handler))]
+
+    # Lambdas are told apart by where they're declared.
+    lambdas = [
+        lambda: None,
+        lambda: None,
+    ]
+    assert handler_identity(lambdas[0]) != handler_identity(lambdas[1])
+
+
+def test_rebuild_reuses_unchanged_subtrees():
+    handlers = make_handlers()
+    router = Router(make_routes(handlers=handlers))
+    users, articles = child(router.tree, "users"), child(router.tree, "articles")
+
+    rebuilt = router.rebuild(make_routes(handlers=handlers))
+    assert child(rebuilt.tree, "users") is users
+    assert child(rebuilt.tree, "articles") is articles
+    assert not router.diff(rebuilt)
+    assert rebuilt.find("user-edit", id=1) == "/users/1/edit/"
+
+
+def test_rebuild_reloaded_handlers():
+    router = Router(make_routes())
+    routes = make_routes(2)
+    users = routes[1]
+    users_children = list(users.children)
+
+    rebuilt = router.rebuild(routes)
+    assert not router.diff(rebuilt)
+    assert rebuilt.match("/").handler() == 2
+    assert rebuilt.match("/users/1/", "GET").handler() == 2
+    assert rebuilt.match("/users/1/edit/").handler() == 2
+    assert rebuilt.match("/articles/a-b/edit/").handler() == -2
+    assert rebuilt.find("user-edit", id=1) == "/users/1/edit/"
+
+    # Reloaded nodes are copies sharing the compiled converters.
+    new_articles = child(rebuilt.tree, "articles")
+    assert new_articles is not child(router.tree, "articles")
+    assert new_articles.converter is child(router.tree, "articles").converter
+
+    # Neither the previous router nor the given routes are modified.
+    assert router.match("/").handler() == 1
+    assert router.match("/users/1/", "GET").handler() == 1
+    assert router.match("/users/1/edit/").handler() == 1
+    assert router.match("/articles/a-b/edit/").handler() == -1
+    assert users.children == users_children
+
+
+def test_rebuild_changed_handler():
+    router = Router([route("a/", lambda: 1, name="a"), route("b/", lambda: 1)])
+    rebuilt = router.rebuild([route("a/", lambda: 2, name="a"), route("b/", lambda: 1)])
+
+    assert router.diff(rebuilt).changed == ("a",)
+    assert rebuilt.match("/a/").handler() == 2
+    assert router.match("/a/").handler() == 1
+
+
+def test_rebuild_changed_routes():
+    handlers = make_handlers()
+    router = Router(make_routes(handlers=handlers))
+    users = child(router.tree, "users")
+
+    routes = make_routes(
+        handlers=handlers, extra=(route("tags/", lambda: None, name="tags"),)
+    )
+    routes[2] = route("articles/<slug:slug>/", lambda: None, name="article")
+    rebuilt = router.rebuild(routes)
+
+    assert child(rebuilt.tree, "users") is users
+    assert child(rebuilt.tree, "articles") is not child(router.tree, "articles")
+    assert rebuilt.match("/tags/").handler_name == "tags"
+    assert rebuilt.match("/articles/a-b/edit/") is NoMatch
+
+    diff = router.diff(rebuilt)
+    assert diff.added == ("tags",)
+    assert diff.removed == ("article-edit",)
+    assert diff.changed == ("article",)
+
+
+def test_rebuild_reuses_subtrees_once():
+    def make_routes(version):
+        return [
+            route("a/", subroutes=(route("x/", lambda: ("a", version)),)),
+            route("b/", subroutes=(route("x/", lambda: ("b", version)),)),
+        ]
+
+    rebuilt = Router(make_routes(1)).rebuild(make_routes(2))
+    assert rebuilt.match("/a/x/").handler() == ("a", 2)
+    assert rebuilt.match("/b/x/").handler() == ("b", 2)
+
+
+def test_rebuild_hosts():
+    def make_host_routes(version, *extra):
+        def status():
+            return version
+
+        return [route("status/", status, name="status"), *extra]
+
+    router = Router(make_routes(), hosts={"api.example.com": make_host_routes(1)})
+    with pytest.raises(RouterConfigurationError, match="hosts"):
+        router.rebuild(make_routes(2))
+
+    rebuilt = router.rebuild(
+        make_routes(2), hosts={"api.example.com": make_host_routes(2)}
+    )
+    assert not router.diff(rebuilt)
+    assert rebuilt.match("/status/", host="api.example.com").handler() == 2
+    assert router.match("/status/", host="api.example.com").handler() == 1
+
+    changed = rebuilt.rebuild(
+        make_routes(2),
+        hosts={
+            "api.example.com": make_host_routes(2, route("tags/", print, name="tags")),
+            "admin.example.com": make_host_routes(2),
+        },
+    )
+    diff = rebuilt.diff(changed)
+    assert diff
+    assert (diff.added, diff.removed, diff.changed) == ((), (), ())
+    assert diff.hosts["api.example.com"].added == ("tags",)
+    assert diff.hosts["admin.example.com"].added == ("status",)
+    assert rebuilt.diff(rebuilt.rebuild(make_routes(2), hosts={})).hosts[
+        "api.example.com"
+    ].removed == ("status",)
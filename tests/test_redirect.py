@@ -1,4 +1,8 @@
-from yrouter import NoMatch, Router, route
+import pytest
+
+from yrouter import NoMatch, Router, RouterConfigurationError, route
+
+from .routes import routes
 
 
 def test_match_find_append_slash_true(router):
@@ -32,3 +36,50 @@ def test_match_find_append_slash_false():
     assert match.redirect_to == "home"
 
     assert router.find("_home") == "/home"
+
+
+@pytest.mark.parametrize("append_slash", [True, False])
+def test_slash_policy_normalize(append_slash):
+    router = Router(routes, append_slash=append_slash, slash_policy="normalize")
+    canonical = "/articles/2015/04/12/" if append_slash else "/articles/2015/04/12"
+
+    for path in (
+        "articles/2015/04/12",
+        "/articles/2015/04/12/",
+        "//articles/./2015/04/../04/12//",
+    ):
+        match = router.match(path)
+        assert match.handler_name == "articles-year-month-day"
+        assert match.kwargs == {"year": 2015, "month": 4, "day": 12}
+        assert not match.should_redirect
+        assert match.redirect_to is None
+        assert match.canonical_path == canonical
+
+    assert router.match("/../").handler_name == "home"
+    assert router.match("/../").canonical_path == "/"
+
+
+def test_slash_policy_strict():
+    router = Router(routes, slash_policy="strict")
+
+    match = router.match("/articles/2015/04/12/")
+    assert match.handler_name == "articles-year-month-day"
+    assert match.canonical_path == "/articles/2015/04/12/"
+    assert router.match("/articles/2015/04/12") is NoMatch
+    assert router.match("/").handler_name == "home"
+
+
+def test_slash_policy_redirect(router):
+    match = router.match("/articles/2015/04/12")
+    assert match.should_redirect
+    assert match.canonical_path == "/articles/2015/04/12/"
+
+    assert router.match("/articles//2015/04/12/") is NoMatch
+
+
+def test_unknown_slash_policy():
+    expected = (
+        "Unknown slash policy 'ignore', expected one of: redirect, normalize, strict."
+    )
+    with pytest.raises(RouterConfigurationError, match=expected):
+        Router(routes, slash_policy="ignore")
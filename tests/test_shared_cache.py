@@ -0,0 +1,136 @@
+from uuid import UUID
+
+import pytest
+
+from yrouter import NoMatch, Router, SharedMatchCache, route
+from yrouter.lazy_kwargs import LazyKwargs
+
+from .routes import routes
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "matches.cache")
+
+
+def test_shared_between_routers(cache_path):
+    first = Router(routes, shared_cache=SharedMatchCache(cache_path))
+    second = Router(routes, cache_size=0, shared_cache=SharedMatchCache(cache_path))
+
+    match = first.match("/articles/2015/04/12")
+    assert second.shared_cache.get("/articles/2015/04/12") == (
+        first.indices[match.node],
+        {"year": 2015, "month": 4, "day": 12},
+        True,
+        {},
+    )
+
+    match = second.match("/articles/2015/04/12")
+    assert match.handler_name == "articles-year-month-day"
+    assert match.kwargs == {"year": 2015, "month": 4, "day": 12}
+    assert match.should_redirect
+    assert match.redirect_to == "/articles/2015/04/12/"
+
+    assert first.match("/unknown/") is NoMatch
+    assert second.shared_cache.get("/unknown/") == (-1, {}, False, {})
+    assert second.match("/unknown/") is NoMatch
+
+
+def test_shared_lazy_kwargs(cache_path):
+    uuid = "23ff7800-50a8-11ec-83dc-479fd603abba"
+    uuid_routes = [route("orgs/<uuid:org>/<int:id>/", lambda: None, name="org")]
+    path = f"/orgs/{uuid}/5/"
+
+    def shared_router(**options):
+        cache = SharedMatchCache(cache_path)
+        return Router(uuid_routes, cache_size=0, shared_cache=cache, **options)
+
+    first = shared_router(lazy_kwargs=True, native_uuids=True)
+    match = first.match(path)
+    assert not match.kwargs.converted
+    index, kwargs, _, converters = first.shared_cache.get(path)
+    assert kwargs == {"org": uuid, "id": 5}
+    assert converters == {"org": 0}
+    assert first.converters[0].name == "uuid"
+
+    match = shared_router(lazy_kwargs=True, native_uuids=True).match(path)
+    assert isinstance(match.kwargs, LazyKwargs)
+    assert not match.kwargs.converted
+    assert match.kwargs == {"org": UUID(uuid), "id": 5}
+
+    match = shared_router(native_uuids=True).match(path)
+    assert match.kwargs == {"org": UUID(uuid), "id": 5}
+
+
+def test_shared_cache_reset_on_route_changes(cache_path):
+    router = Router(routes, shared_cache=SharedMatchCache(cache_path))
+    router.match("/int/5/")
+    assert router.shared_cache.get("/int/5/") is not None
+
+    other = Router(
+        (route(""), route("int/<int:id>", lambda: None, name="other")),
+        shared_cache=SharedMatchCache(cache_path),
+    )
+    assert other.fingerprint() != router.fingerprint()
+    assert other.shared_cache.get("/int/5/") is None
+
+    assert Router(routes).fingerprint() == router.fingerprint()
+    assert Router(routes, append_slash=False).fingerprint() != router.fingerprint()
+    for options in (
+        {"max_segments": 3},
+        {"max_path_length": 64},
+        {"native_uuids": True},
+    ):
+        assert Router(routes, **options).fingerprint() != router.fingerprint()
+
+
+def test_shared_cache_rolling_reload(cache_path):
+    def make_routes(*extra):
+        return [route(""), *extra, route("<int:id>/", lambda: None, name="id")]
+
+    old = Router(make_routes(), cache_size=0, shared_cache=SharedMatchCache(cache_path))
+    new = Router(
+        make_routes(route("a/"), route("b/")),
+        cache_size=0,
+        shared_cache=SharedMatchCache(cache_path),
+    )
+
+    # Written by a process still running the old routes, after the new ones bound the file.
+    assert old.match("/5/").handler_name == "id"
+    assert old.shared_cache.get("/5/") is not None
+    assert new.shared_cache.get("/5/") is None
+    assert new.match("/5/").handler_name == "id"
+
+    new.shared_cache.set("/6/", len(new.nodes), {"id": 6}, False)
+    assert new.match("/6/").handler_name == "id"
+
+
+def test_shared_cache_entries(cache_path):
+    cache = SharedMatchCache(cache_path, slots=4, slot_size=64)
+    cache.bind(b"routes")
+
+    cache.set("", 0, {}, False)
+    assert cache.get("") == (0, {}, False, {})
+
+    cache.set("a", 1, {"id": 1}, False)
+    assert cache.get("a") == (1, {"id": 1}, False, {})
+    assert cache.get("b") is None
+
+    cache.set("long", 1, {"path": "a" * 64}, False)
+    assert cache.get("long") is None
+
+    cache.set("float", 1, {"value": 1.5}, False)
+    assert cache.get("float") is None
+
+    cache.set("lazy", 1, {"id": "a:b", "n": 1}, False, {"id": 2})
+    assert cache.get("lazy") == (1, {"id": "a:b", "n": 1}, False, {"id": 2})
+
+    # A corrupted slot is read as a miss
+    offset = cache._offset(b"a")
+    cache._mm[offset + 10] ^= 0xFF
+    assert cache.get("a") is None
+
+    cache.set("a", 1, {}, True)
+    cache.clear()
+    assert cache.get("a") is None
+    cache.close()
@@ -0,0 +1,144 @@
+import threading
+
+import pytest
+
+from yrouter import NoMatch, Router, RouterConfigurationError, route
+
+from .routes import routes
+
+
+@pytest.fixture
+def stats_router():
+    return Router(routes, stats=True, sample_rate=1)
+
+
+def test_stats_hits_and_redirects(stats_router):
+    stats_router.match("/int/5/")
+    stats_router.match("/int/5")
+    stats_router.match("/int/6/")
+
+    route = stats_router.stats()["routes"]["/int/<int:id>/"]
+    assert route["name"] == "int"
+    assert route["hits"] == 3
+    assert route["redirects"] == 1
+    assert route["not_allowed"] == 0
+    assert route["latency"]["count"] == 3
+    assert route["latency"]["buckets"][float("inf")] == 3
+    assert route["latency"]["sum"] > 0
+
+    assert stats_router.stats()["routes"]["/"]["hits"] == 0
+
+
+def test_stats_misses_by_deepest_node(stats_router):
+    assert stats_router.match("/articles/year-2015/") is NoMatch
+    assert stats_router.match("/articles/year-2015/") is NoMatch
+    assert stats_router.match("/users/") is NoMatch
+    assert stats_router.match("/unknown-1/") is NoMatch
+
+    assert stats_router.stats()["misses"] == {
+        "/articles/": 2,
+        "/users/": 1,
+        "/": 1,
+    }
+
+
+def test_stats_method_not_allowed():
+    router = Router(
+        (route(""), route("posts/", {"GET": lambda: None}, name="posts")), stats=True
+    )
+    assert not router.match("/posts/", method="POST")
+    assert router.match("/posts/", method="GET")
+
+    assert router.stats()["routes"]["/posts/"]["not_allowed"] == 1
+    assert router.stats()["routes"]["/posts/"]["hits"] == 1
+
+
+def test_stats_sampling():
+    router = Router(routes, stats=True, sample_rate=0.25)
+    for _ in range(8):
+        router.match("/int/5/")
+
+    route = router.stats()["routes"]["/int/<int:id>/"]
+    assert route["hits"] == 8
+    assert route["latency"]["count"] == 2
+
+
+def test_stats_threads(stats_router):
+    def work():
+        for _ in range(100):
+            stats_router.match("/int/5/")
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert stats_router.stats()["routes"]["/int/<int:id>/"]["hits"] == 400
+
+
+def test_prometheus_metrics(stats_router):
+    stats_router.match("/int/5")
+    stats_router.match("/unknown-1/")
+    metrics = stats_router.prometheus_metrics()
+
+    assert "# TYPE yrouter_hits_total counter" in metrics
+    assert 'yrouter_hits_total{route="/int/<int:id>/",name="int"} 1' in metrics
+    assert 'yrouter_redirects_total{route="/int/<int:id>/",name="int"} 1' in metrics
+    assert 'yrouter_misses_total{node="/"} 1' in metrics
+    assert "# TYPE yrouter_match_seconds histogram" in metrics
+    assert (
+        'yrouter_match_seconds_bucket{route="/int/<int:id>/",name="int",le="+Inf"} 1'
+        in metrics
+    )
+    assert 'yrouter_match_seconds_count{route="/int/<int:id>/",name="int"} 1' in metrics
+
+
+def test_stats_disabled(router):
+    with pytest.raises(RouterConfigurationError, match="Stats aren't enabled"):
+        router.stats()
+    with pytest.raises(RouterConfigurationError, match="Stats aren't enabled"):
+        router.prometheus_metrics()
+
+
+def test_stats_hosts():
+    shared = (route("", lambda: None, name="home"),)
+    router = Router(
+        routes,
+        hosts={"a.example.com": shared, "b.example.com": shared},
+        stats=True,
+        sample_rate=1,
+    )
+    router.match("/", host="a.example.com")
+    router.match("/", host="b.example.com")
+    router.match("/unknown/", host="b.example.com")
+    router.match("/int/5/")
+
+    stats = router.stats()
+    assert stats["routes"]["/int/<int:id>/"]["hits"] == 1
+    assert stats["routes"]["/"]["hits"] == 0
+    host = stats["hosts"]["a.example.com, b.example.com"]
+    assert host["routes"]["/"]["hits"] == 2
+    assert host["misses"] == {"/": 1}
+
+    metrics = router.prometheus_metrics()
+    assert 'yrouter_hits_total{route="/int/<int:id>/",name="int"} 1' in metrics
+    assert (
+        'yrouter_hits_total{host="a.example.com, b.example.com",route="/",name="home"} 2'
+        in metrics
+    )
+    assert metrics.count("# TYPE yrouter_hits_total counter") == 1
+
+
+def test_stats_exited_threads(stats_router):
+    def work():
+        stats_router.match("/int/5/")
+
+    for _ in range(3):
+        thread = threading.Thread(target=work)
+        thread.start()
+        thread.join()
+
+    assert stats_router.stats()["routes"]["/int/<int:id>/"]["hits"] == 3
+    # The counters of exited threads are folded into a single total.
+    assert stats_router.route_stats._threads == []